@@ -8,6 +8,8 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 import logging
 
+import numpy as np
+
 from agent_framework import (
     Executor,
     WorkflowContext,
@@ -16,23 +18,65 @@ from agent_framework import (
 
 from utils.vector_store import VectorStore, DocumentChunk
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Static system instruction, built once at import time
+SYSTEM_INSTRUCTION = """You are a helpful assistant that answers questions based on website content.
+
+Your task:
+1. Answer the user's question using ONLY the information provided in the context
+2. Be specific and cite which source you're using
+3. If the context doesn't contain enough information, say so
+4. Keep answers concise but complete
+5. Always reference the source number when using information
+
+Format your answer naturally, mentioning relevant source numbers inline like "According to Source 1..." or "As mentioned in Source 2..."."""
+
+# Static formatting guide sent as its own user turn. Keeping it
+# byte-identical across queries extends the cacheable prompt prefix
+# beyond the system instruction.
+FORMATTING_GUIDE = """When answering, use only the context supplied with the question. Cite your sources by number, mentioning relevant source numbers inline like "According to Source 1..." or "As mentioned in Source 2...". Provide a comprehensive answer."""
+
+# Skeletons for the per-query strings, %-formatted once per request
+QUESTION_TEMPLATE = "Context:\n%s\n\nQuestion:\n%s"
+CONTEXT_PART_TEMPLATE = "[Source %d] %s%s\nURL: %s\nContent: %s\n"
+
+
+@dataclass(slots=True, frozen=True)
+class ChunkView:
+    """
+    Lightweight view of a retrieved chunk plus its score.
+
+    A slotted dataclass instead of a per-result dict keeps allocation
+    pressure low at large top_k and makes downstream access attribute
+    lookups rather than dict hashing.
+    """
+    text: str
+    url: str
+    title: str
+    heading: Optional[str]
+    score: float
+
 
 @dataclass
 class SearchRequest:
     """Request to search the website knowledge base."""
     query: str
     top_k: int = 5
+    # Optional precomputed query embedding so search can skip re-embedding
+    embedding: Optional[np.ndarray] = None
+    # Whether the answer should be streamed token by token
+    stream: bool = False
 
 
 @dataclass
 class SearchResult:
     """Result from searching the knowledge base."""
     query: str
-    chunks: List[Dict]
+    chunks: List[ChunkView]
     sources: List[str]
+    # Whether the answer should be streamed token by token
+    stream: bool = False
 
 
 class WebsiteSearchAgent(Executor):
@@ -74,33 +118,44 @@ class WebsiteSearchAgent(Executor):
         Returns:
             SearchResult with relevant chunks and sources
         """
-        logger.info(f"Searching for: {request.query}")
-        
-        # Perform semantic search
-        results = self.vector_store.search(request.query, top_k=request.top_k)
+        logger.debug(f"Searching for: {request.query}")
+
+        # Perform semantic search in a thread so the blocking ChromaDB
+        # call doesn't stall the event loop. Reuse the query embedding if
+        # the caller already computed one (saves a Vertex AI round-trip).
+        if request.embedding is not None:
+            results = await asyncio.to_thread(
+                self.vector_store.search_by_vector,
+                request.embedding, request.top_k
+            )
+        else:
+            results = await asyncio.to_thread(
+                self.vector_store.search,
+                request.query, request.top_k
+            )
         
         # Format results
         chunks = []
         sources = set()
-        
+
         for chunk, score in results:
-            chunk_data = {
-                'text': chunk.text,
-                'url': chunk.url,
-                'title': chunk.title,
-                'heading': chunk.heading,
-                'score': score
-            }
-            chunks.append(chunk_data)
+            chunks.append(ChunkView(
+                text=chunk.text,
+                url=chunk.url,
+                title=chunk.title,
+                heading=chunk.heading,
+                score=score
+            ))
             sources.add(chunk.url)
         
         result = SearchResult(
             query=request.query,
             chunks=chunks,
-            sources=list(sources)
+            sources=list(sources),
+            stream=request.stream
         )
         
-        logger.info(f"Found {len(chunks)} relevant chunks from {len(sources)} pages")
+        logger.debug(f"Found {len(chunks)} relevant chunks from {len(sources)} pages")
         
         # Send result to next step
         await ctx.send_message(result)
@@ -146,113 +201,164 @@ class AnswerGenerationAgent(Executor):
         self.chat_client = chat_client
         logger.info("Initialized AnswerGenerationAgent")
     
-    def _build_context(self, search_result: SearchResult) -> str:
+    @staticmethod
+    def _build_context(search_result: SearchResult) -> str:
         """Build context from search results."""
-        context_parts = []
-        
-        for i, chunk in enumerate(search_result.chunks, 1):
-            heading = chunk.get('heading', '')
-            heading_str = f" - {heading}" if heading else ""
-            
-            context_parts.append(
-                f"[Source {i}] {chunk['title']}{heading_str}\n"
-                f"URL: {chunk['url']}\n"
-                f"Content: {chunk['text']}\n"
+        context_parts = [
+            CONTEXT_PART_TEMPLATE % (
+                i,
+                chunk.title,
+                " - %s" % chunk.heading if chunk.heading else "",
+                chunk.url,
+                chunk.text,
             )
-        
+            for i, chunk in enumerate(search_result.chunks, 1)
+        ]
+
         return "\n".join(context_parts)
+
+    @staticmethod
+    def _build_messages(
+        context: str,
+        query: str,
+        chat_history: Optional[List[Dict]] = None
+    ) -> List:
+        """
+        Build the chat message list shared by both answer handlers.
+
+        The static formatting guide comes first (prefix-cacheable), then
+        any chat history, then the dynamic context + question message.
+        """
+        from utils.vertex_chat_client import ChatMessage
+
+        messages = [ChatMessage(role='user', content=FORMATTING_GUIDE)]
+
+        if chat_history:
+            for msg in chat_history:
+                messages.append(ChatMessage(
+                    role=msg.get('role', 'user'),
+                    content=msg.get('content', '')
+                ))
+
+        messages.append(ChatMessage(
+            role='user',
+            content=QUESTION_TEMPLATE % (context, query)
+        ))
+
+        return messages
     
-    def _extract_source_urls(self, search_result: SearchResult) -> List[Dict]:
-        """Extract unique sources with metadata."""
-        sources_dict = {}
-        
+    @staticmethod
+    def _extract_source_urls(search_result: SearchResult) -> List[Dict]:
+        """Extract unique sources with metadata in a single pass."""
+        sources_dict: Dict[str, Dict] = {}
+
         for chunk in search_result.chunks:
-            url = chunk['url']
-            if url not in sources_dict:
-                sources_dict[url] = {
-                    'url': url,
-                    'title': chunk['title'],
-                    'sections': []
-                }
-            
-            if chunk.get('heading'):
-                sources_dict[url]['sections'].append(chunk['heading'])
-        
-        # Remove duplicate sections
+            source = sources_dict.setdefault(chunk.url, {
+                'url': chunk.url,
+                'title': chunk.title,
+                'sections': []
+            })
+
+            if chunk.heading:
+                source['sections'].append(chunk.heading)
+
+        # Order-preserving section dedup without temporary sets
         for source in sources_dict.values():
-            source['sections'] = list(set(source['sections']))
-        
+            source['sections'] = list(dict.fromkeys(source['sections']))
+
         return list(sources_dict.values())
     
-    @handler
-    async def process_search_result(
+    async def _generate(
         self,
+        query: str,
         search_result: SearchResult,
-        ctx: WorkflowContext
+        ctx: WorkflowContext,
+        chat_history: Optional[List[Dict]] = None
     ) -> AnswerResponse:
         """
-        Process search results and generate an answer.
-        
+        Shared answer generation used by both handlers.
+
+        Builds the context and messages, calls Vertex AI (streaming token
+        events when the search result requests it), and yields the final
+        AnswerResponse to the workflow output.
+
         Args:
-            search_result: Search results from the search agent
+            query: User's question
+            search_result: Search results to ground the answer on
             ctx: Workflow context
-            
+            chat_history: Optional prior conversation turns
+
         Returns:
             AnswerResponse with generated answer and sources
         """
-        logger.info(f"Generating answer for: {search_result.query}")
-        
-        # Build context from search results
-        context = self._build_context(search_result)
-        
-        # Create system instruction
-        system_instruction = """You are a helpful assistant that answers questions based on website content.
+        logger.debug(f"Generating answer for: {query}")
 
-Your task:
-1. Answer the user's question using ONLY the information provided in the context
-2. Be specific and cite which source you're using
-3. If the context doesn't contain enough information, say so
-4. Keep answers concise but complete
-5. Always reference the source number when using information
+        # Build context in a thread while warming up the Vertex AI client
+        # so the two run concurrently
+        context, _ = await asyncio.gather(
+            asyncio.to_thread(self._build_context, search_result),
+            self.chat_client._ensure_session()
+        )
 
-Format your answer naturally, mentioning relevant source numbers inline like "According to Source 1..." or "As mentioned in Source 2..."."""
+        messages = self._build_messages(context, query, chat_history)
 
-        # Build prompt
-        prompt = f"""Context from website:
-{context}
+        # Extract sources
+        sources = self._extract_source_urls(search_result)
 
-User Question: {search_result.query}
+        if search_result.stream:
+            # Emit sources immediately, then forward tokens as Vertex
+            # produces them instead of buffering the full answer
+            await ctx.yield_output({'type': 'sources', 'sources': sources})
 
-Please provide a comprehensive answer based on the context above. Cite your sources by number."""
+            answer_parts = []
+            async for token in self.chat_client.generate_response_stream(
+                messages=messages,
+                system_instruction=SYSTEM_INSTRUCTION,
+                temperature=0.3  # Lower temperature for more factual responses
+            ):
+                answer_parts.append(token)
+                await ctx.yield_output({'type': 'token', 'content': token})
+
+            answer = ''.join(answer_parts)
+        else:
+            # Generate response
+            answer = await self.chat_client.generate_response(
+                messages=messages,
+                system_instruction=SYSTEM_INSTRUCTION,
+                temperature=0.3  # Lower temperature for more factual responses
+            )
 
-        # Import ChatMessage from our client
-        from utils.vertex_chat_client import ChatMessage
-        
-        messages = [ChatMessage(role='user', content=prompt)]
-        
-        # Generate response
-        answer = await self.chat_client.generate_response(
-            messages=messages,
-            system_instruction=system_instruction,
-            temperature=0.3  # Lower temperature for more factual responses
-        )
-        
-        # Extract sources
-        sources = self._extract_source_urls(search_result)
-        
         response = AnswerResponse(
-            query=search_result.query,
+            query=query,
             answer=answer,
             sources=sources
         )
-        
-        logger.info("Generated answer successfully")
-        
+
+        logger.debug("Generated answer successfully")
+
         # Yield the output so it can be captured
         await ctx.yield_output(response)
-        
+
         return response
-    
+
+    @handler
+    async def process_search_result(
+        self,
+        search_result: SearchResult,
+        ctx: WorkflowContext
+    ) -> AnswerResponse:
+        """
+        Process search results and generate an answer.
+
+        Args:
+            search_result: Search results from the search agent
+            ctx: Workflow context
+
+        Returns:
+            AnswerResponse with generated answer and sources
+        """
+        return await self._generate(search_result.query, search_result, ctx)
+
     @handler
     async def generate_answer(
         self,
@@ -261,74 +367,14 @@ Please provide a comprehensive answer based on the context above. Cite your sour
     ) -> AnswerResponse:
         """
         Generate an answer based on search results.
-        
+
         Args:
             request: Answer request with query and search results
             ctx: Workflow context
-            
+
         Returns:
             AnswerResponse with generated answer and sources
         """
-        logger.info(f"Generating answer for: {request.query}")
-        
-        # Build context from search results
-        context = self._build_context(request.search_result)
-        
-        # Create system instruction
-        system_instruction = """You are a helpful assistant that answers questions based on website content.
-
-Your task:
-1. Answer the user's question using ONLY the information provided in the context
-2. Be specific and cite which source you're using
-3. If the context doesn't contain enough information, say so
-4. Keep answers concise but complete
-5. Always reference the source number when using information
-
-Format your answer naturally, mentioning relevant source numbers inline like "According to Source 1..." or "As mentioned in Source 2..."."""
-
-        # Build prompt
-        prompt = f"""Context from website:
-{context}
-
-User Question: {request.query}
-
-Please provide a comprehensive answer based on the context above. Cite your sources by number."""
-
-        # Import ChatMessage from our client
-        from utils.vertex_chat_client import ChatMessage
-        
-        messages = []
-        
-        # Add chat history if available
-        if request.chat_history:
-            for msg in request.chat_history:
-                messages.append(ChatMessage(
-                    role=msg.get('role', 'user'),
-                    content=msg.get('content', '')
-                ))
-        
-        # Add current query
-        messages.append(ChatMessage(role='user', content=prompt))
-        
-        # Generate response
-        answer = await self.chat_client.generate_response(
-            messages=messages,
-            system_instruction=system_instruction,
-            temperature=0.3  # Lower temperature for more factual responses
-        )
-        
-        # Extract sources
-        sources = self._extract_source_urls(request.search_result)
-        
-        response = AnswerResponse(
-            query=request.query,
-            answer=answer,
-            sources=sources
+        return await self._generate(
+            request.query, request.search_result, ctx, request.chat_history
         )
-        
-        logger.info("Generated answer successfully")
-        
-        # Yield result to output so it can be captured
-        await ctx.yield_output(response)
-        
-        return response
@@ -21,12 +21,43 @@ from agents.search_agent import (
     SearchRequest,
     AnswerRequest,
 )
+from utils.semantic_cache import SemanticCache
+from utils.tokenizer import count_tokens
 from utils.vector_store import VectorStore
 from utils.vertex_chat_client import VertexAIChatClient
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Token budget for the sliding chat history window. Staying below this
+# keeps the prompt prefix stable enough for caching and avoids slow
+# long-context decodes.
+MAX_HISTORY_TOKENS = 2048
+
+# Canned fast-path responses for inputs that don't warrant a retrieval
+# + generation round-trip
+CANNED_RESPONSES = {
+    'hi': "Hello! Ask me anything about the website content.",
+    'hello': "Hello! Ask me anything about the website content.",
+    'hey': "Hello! Ask me anything about the website content.",
+    'thanks': "You're welcome! Let me know if you have more questions.",
+    'thank you': "You're welcome! Let me know if you have more questions.",
+    'ok': "Let me know if you have any questions about the website.",
+    'bye': "Goodbye! Come back any time.",
+}
+DEFAULT_TRIVIAL_ANSWER = "Please ask a more specific question about the website content."
+
+# Answer returned when the workflow produces no output; callers use it
+# to recognize transient failures (e.g. to keep them out of caches)
+FALLBACK_ANSWER = "Sorry, I could not process your query."
+
+
+def _trivial_answer(query: str) -> Optional[str]:
+    """Return a canned answer for empty/trivial queries, or None."""
+    stripped = query.strip().lower()
+    if len(stripped) < 3:
+        return CANNED_RESPONSES.get(stripped, DEFAULT_TRIVIAL_ANSWER)
+    return CANNED_RESPONSES.get(stripped)
+
 
 class WebsiteChatbotWorkflow:
     """
@@ -52,7 +83,10 @@ class WebsiteChatbotWorkflow:
         """
         self.vector_store = vector_store
         self.vertex_client = vertex_client
-        
+
+        # Semantic cache so near-duplicate queries skip search + generation
+        self.semantic_cache = SemanticCache()
+
         # Initialize agents
         self.search_agent = WebsiteSearchAgent(vector_store)
         self.answer_agent = AnswerGenerationAgent(vertex_client)
@@ -93,10 +127,95 @@ class WebsiteChatbotWorkflow:
         Returns:
             Dictionary with answer and sources
         """
-        logger.info(f"Processing query: {query}")
-        
-        # Create initial search request
-        search_request = SearchRequest(query=query, top_k=top_k)
+        logger.debug(f"Processing query: {query}")
+
+        # Single event-handling code path: accumulate the streaming
+        # variant instead of duplicating its state machine here
+        answer_parts = []
+        sources = []
+
+        async for event in self.process_query_stream(query, chat_history, top_k):
+            if event['type'] == 'token':
+                answer_parts.append(event['content'])
+            elif event['type'] == 'sources':
+                sources = event['sources']
+
+        return {
+            'query': query,
+            'answer': ''.join(answer_parts) if answer_parts else FALLBACK_ANSWER,
+            'sources': sources
+        }
+
+    async def process_queries(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        max_concurrency: int = 8
+    ) -> List[Dict]:
+        """
+        Process multiple independent queries concurrently.
+
+        All queries are embedded in a single Vertex AI batch call, then
+        each one runs through the workflow in parallel, bounded by a
+        semaphore to keep Vertex load in check.
+
+        Args:
+            queries: List of user questions
+            top_k: Number of search results to retrieve per query
+            max_concurrency: Maximum number of queries in flight at once
+
+        Returns:
+            List of result dictionaries, in the same order as queries
+        """
+        if not queries:
+            return []
+
+        logger.debug(f"Processing {len(queries)} queries concurrently")
+
+        # One batch embedding RPC instead of one per query
+        embeddings = await asyncio.to_thread(self.vector_store.embed_batch, queries)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(query: str, embedding) -> Dict:
+            async with semaphore:
+                return await self._process_with_embedding(query, embedding, top_k)
+
+        return list(await asyncio.gather(*[
+            run_one(query, embedding)
+            for query, embedding in zip(queries, embeddings)
+        ]))
+
+    async def _process_with_embedding(
+        self,
+        query: str,
+        query_embedding,
+        top_k: int
+    ) -> Dict:
+        """
+        Run the cache lookup and workflow for a query whose embedding has
+        already been computed.
+
+        Args:
+            query: User's question
+            query_embedding: Precomputed query embedding
+            top_k: Number of search results to retrieve
+
+        Returns:
+            Dictionary with answer and sources
+        """
+        # Check the semantic cache before running the full workflow
+        cached = await self.semantic_cache.lookup(query_embedding)
+        if cached is not None:
+            logger.debug("Semantic cache hit - returning cached answer")
+            return {
+                'query': query,
+                'answer': cached['answer'],
+                'sources': cached['sources']
+            }
+
+        # Create initial search request, sharing the already-computed embedding
+        search_request = SearchRequest(query=query, top_k=top_k, embedding=query_embedding)
         
         # Track workflow output
         output_data = {}
@@ -105,14 +224,14 @@ class WebsiteChatbotWorkflow:
         # Run workflow
         async for event in self.workflow.run_stream(search_request):
             if isinstance(event, WorkflowOutputEvent):
-                logger.info(f"Workflow output event: {type(event.data)}")
+                logger.debug(f"Workflow output event: {type(event.data)}")
                 
                 # Capture output
                 if hasattr(event.data, 'query'):
                     output_data = event.data
             
             elif isinstance(event, WorkflowStatusEvent):
-                logger.info(f"Workflow status: {event.state}")
+                logger.debug(f"Workflow status: {event.state}")
                 
                 # Check if we need to pass data between agents
                 if event.state == WorkflowRunState.IDLE:
@@ -121,15 +240,17 @@ class WebsiteChatbotWorkflow:
         
         # Format response
         if hasattr(output_data, 'answer'):
-            return {
+            response = {
                 'query': query,
                 'answer': output_data.answer,
                 'sources': output_data.sources
             }
+            await self.semantic_cache.put(query, query_embedding, response)
+            return response
         else:
             return {
                 'query': query,
-                'answer': 'Sorry, I could not process your query.',
+                'answer': FALLBACK_ANSWER,
                 'sources': []
             }
     
@@ -150,39 +271,94 @@ class WebsiteChatbotWorkflow:
         Yields:
             Dictionary chunks with type, content, and metadata
         """
-        logger.info(f"Processing streaming query: {query}")
-        
-        # Create initial search request
-        search_request = SearchRequest(query=query, top_k=top_k)
-        
+        logger.debug(f"Processing streaming query: {query}")
+
+        # Trivial inputs skip embedding, search, and generation entirely
+        canned = _trivial_answer(query)
+        if canned is not None:
+            yield {
+                'type': 'sources',
+                'sources': []
+            }
+            yield {
+                'type': 'token',
+                'content': canned
+            }
+            yield {
+                'type': 'complete',
+                'query': query
+            }
+            return
+
+        # Check the semantic cache before running the full workflow
+        query_embedding = await self.vector_store.embed_query_async(query)
+        cached = await self.semantic_cache.lookup(query_embedding)
+        if cached is not None:
+            logger.debug("Semantic cache hit - replaying cached answer")
+            yield {
+                'type': 'sources',
+                'sources': cached['sources']
+            }
+            yield {
+                'type': 'token',
+                'content': cached['answer']
+            }
+            yield {
+                'type': 'complete',
+                'query': query
+            }
+            return
+
+        # Create initial search request, sharing the already-computed
+        # embedding and asking the answer agent to stream tokens
+        search_request = SearchRequest(
+            query=query, top_k=top_k, embedding=query_embedding, stream=True
+        )
+
         # Track workflow output
         sources_sent = False
-        
+        answer_parts = []
+        cached_answer = None
+        cached_sources = []
+
         # Run workflow
         async for event in self.workflow.run_stream(search_request):
             if isinstance(event, WorkflowOutputEvent):
-                logger.info(f"Workflow output event: {type(event.data)}")
-                
-                # Send sources first if available
-                if hasattr(event.data, 'sources') and not sources_sent:
+                logger.debug(f"Workflow output event: {type(event.data)}")
+                data = event.data
+
+                # Token / sources events streamed live by the answer agent
+                if isinstance(data, dict) and 'type' in data:
+                    if data['type'] == 'sources':
+                        if sources_sent:
+                            continue
+                        cached_sources = data['sources']
+                        sources_sent = True
+                    elif data['type'] == 'token':
+                        answer_parts.append(data['content'])
+                    yield data
+                    continue
+
+                # Final AnswerResponse - capture for caching; only emit
+                # events here if nothing was streamed (fallback path)
+                if hasattr(data, 'sources') and not sources_sent:
+                    cached_sources = data.sources
                     yield {
                         'type': 'sources',
-                        'sources': event.data.sources
+                        'sources': data.sources
                     }
                     sources_sent = True
-                
-                # Stream answer tokens
-                if hasattr(event.data, 'answer'):
-                    # For now, send the full answer as we don't have token-level streaming
-                    # In a future version, this could stream individual tokens
-                    answer = event.data.answer
-                    yield {
-                        'type': 'token',
-                        'content': answer
-                    }
-            
+
+                if hasattr(data, 'answer'):
+                    cached_answer = data.answer
+                    if not answer_parts:
+                        yield {
+                            'type': 'token',
+                            'content': data.answer
+                        }
+
             elif isinstance(event, WorkflowStatusEvent):
-                logger.info(f"Workflow status: {event.state}")
+                logger.debug(f"Workflow status: {event.state}")
                 
                 # Optionally yield status updates
                 yield {
@@ -190,6 +366,15 @@ class WebsiteChatbotWorkflow:
                     'state': event.state.name if hasattr(event.state, 'name') else str(event.state)
                 }
         
+        # Cache the full answer for future near-duplicate queries
+        if cached_answer is None and answer_parts:
+            cached_answer = ''.join(answer_parts)
+        if cached_answer is not None:
+            await self.semantic_cache.put(query, query_embedding, {
+                'answer': cached_answer,
+                'sources': cached_sources
+            })
+
         # Send completion event
         yield {
             'type': 'complete',
@@ -249,9 +434,14 @@ class WebsiteChatbotWorkflow:
                     'content': result['answer']
                 })
                 
-                # Keep history manageable
-                if len(chat_history) > 10:
-                    chat_history = chat_history[-10:]
+                # Keep history within the token budget, dropping the
+                # oldest user/assistant pair first; always keep the
+                # latest exchange intact
+                while (
+                    len(chat_history) > 2
+                    and sum(count_tokens(m['content']) for m in chat_history) > MAX_HISTORY_TOKENS
+                ):
+                    chat_history = chat_history[2:]
                 
             except KeyboardInterrupt:
                 print("\n\nGoodbye! 👋")
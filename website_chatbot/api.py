@@ -4,10 +4,15 @@ RESTful API endpoints for website-grounded Q&A.
 """
 
 import asyncio
+import hashlib
+import json
 import os
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional, List, Dict
+from uuid import uuid4
 from dotenv import load_dotenv
 import logging
 
@@ -18,7 +23,30 @@ from pydantic import BaseModel, Field
 
 from utils.vector_store import VectorStore
 from utils.vertex_chat_client import VertexAIChatClient
-from agents.workflow import WebsiteChatbotWorkflow
+from agents.workflow import WebsiteChatbotWorkflow, FALLBACK_ANSWER
+
+# orjson (C extension) serializes 2-5x faster and returns bytes; the
+# stdlib json module is the fallback
+try:
+    import orjson
+    _HAS_ORJSON = True
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _HAS_ORJSON = False
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# Pre-encoded SSE frame prefixes so the hot streaming loop only
+# concatenates bytes
+_SSE_PREFIX = {
+    'sources': b'event: sources\ndata: ',
+    'token': b'event: token\ndata: ',
+    'complete': b'event: complete\ndata: ',
+    'error': b'event: error\ndata: ',
+}
 
 # Configure logging
 logging.basicConfig(
@@ -37,6 +65,74 @@ vertex_client: Optional[VertexAIChatClient] = None
 workflow: Optional[WebsiteChatbotWorkflow] = None
 
 
+class ResponseCache:
+    """
+    Exact-match LRU+TTL cache for chat responses.
+
+    First cache level in front of the workflow: identical requests skip
+    retrieval and generation entirely. The semantic (near-duplicate)
+    level is handled inside the workflow by its SemanticCache, which
+    reuses the query embedding it computes anyway.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def key(query: str, top_k: int, chat_history: Optional[List[Dict]]) -> str:
+        """Cache key over the query, top_k, and the recent history tail."""
+        tail = (chat_history or [])[-4:]
+        payload = json.dumps([query, top_k, tail], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response for key, or None if absent/expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        result, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: Dict) -> None:
+        """Store a response, evicting the least recently used on overflow."""
+        self._entries[key] = (result, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache()
+
+# In-flight and finished indexing jobs, keyed by job id
+index_jobs: Dict[str, Dict] = {}
+
+# Strong references to running index tasks: the event loop only keeps
+# weak references, so without these a fire-and-forget job could be
+# garbage-collected mid-run
+_index_tasks: Dict[str, asyncio.Task] = {}
+
+# Finished job records kept around for polling before eviction
+_MAX_FINISHED_JOBS = 50
+
+
+def _prune_index_jobs() -> None:
+    """Evict the oldest finished job records beyond the retention cap."""
+    finished = [
+        job_id for job_id, job in index_jobs.items()
+        if job['status'] in ('completed', 'failed')
+    ]
+    for job_id in finished[:max(0, len(finished) - _MAX_FINISHED_JOBS)]:
+        del index_jobs[job_id]
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -90,12 +186,18 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
 
 
-# Create FastAPI app
+# Create FastAPI app, serializing responses with orjson when available
+_app_kwargs = {}
+if _HAS_ORJSON:
+    from fastapi.responses import ORJSONResponse
+    _app_kwargs['default_response_class'] = ORJSONResponse
+
 app = FastAPI(
     title="Website Chatbot API",
     description="Grounded Q&A API with indexed website content using Google Vertex AI",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    **_app_kwargs
 )
 
 # Configure CORS
@@ -204,14 +306,25 @@ async def chat(request: ChatRequest):
     
     try:
         logger.info(f"Processing chat request: {request.query[:100]}")
-        
-        # Process query through workflow
-        result = await workflow.process_query(
-            query=request.query,
-            chat_history=request.chat_history,
-            top_k=request.top_k
-        )
-        
+
+        # Level 1: exact-match cache (level 2, semantic, lives in the
+        # workflow's SemanticCache)
+        cache_key = response_cache.key(request.query, request.top_k, request.chat_history)
+        result = response_cache.get(cache_key)
+
+        if result is None:
+            # Process query through workflow
+            result = await workflow.process_query(
+                query=request.query,
+                chat_history=request.chat_history,
+                top_k=request.top_k
+            )
+            # Don't cache failures: the fallback answer means the
+            # workflow produced nothing, and replaying it for the full
+            # TTL would outlive whatever transient error caused it
+            if result.get('answer') and result['answer'] != FALLBACK_ANSWER:
+                response_cache.put(cache_key, result)
+
         return ChatResponse(
             answer=result.get('answer', ''),
             sources=result.get('sources', []),
@@ -245,32 +358,47 @@ async def chat_stream(request: ChatRequest):
     
     async def event_generator():
         """Generate SSE events for streaming response."""
+        logger.info(f"Processing streaming chat request: {request.query[:100]}")
+
+        # Decouple token production from client sends: a slow client
+        # reading this generator no longer stalls the workflow
+        queue: asyncio.Queue = asyncio.Queue(maxsize=32)
+
+        async def produce():
+            try:
+                async for chunk in workflow.process_query_stream(
+                    query=request.query,
+                    chat_history=request.chat_history,
+                    top_k=request.top_k
+                ):
+                    await queue.put(chunk)
+            except asyncio.CancelledError:
+                # Cancelled by the consumer's cleanup - nobody drains
+                # the queue anymore, so a sentinel put on a full queue
+                # would block this (already cancelled) task forever
+                raise
+            except Exception as e:
+                logger.error(f"Error in streaming chat: {e}")
+                await queue.put({'type': 'error', 'error': str(e)})
+            await queue.put(None)
+
+        # Send the initial event before spawning the producer: if the
+        # client is already gone, GeneratorExit arrives at this yield
+        # and there is no task to leak yet
+        yield b'event: start\ndata: {"status": "processing"}\n\n'
+
+        producer = asyncio.create_task(produce())
         try:
-            logger.info(f"Processing streaming chat request: {request.query[:100]}")
-            
-            # Send initial event
-            yield f"event: start\ndata: {{\"status\": \"processing\"}}\n\n"
-            
-            # Process query through workflow with streaming
-            async for chunk in workflow.process_query_stream(
-                query=request.query,
-                chat_history=request.chat_history,
-                top_k=request.top_k
-            ):
-                if chunk.get('type') == 'sources':
-                    import json
-                    yield f"event: sources\ndata: {json.dumps(chunk)}\n\n"
-                elif chunk.get('type') == 'token':
-                    import json
-                    yield f"event: token\ndata: {json.dumps(chunk)}\n\n"
-                elif chunk.get('type') == 'complete':
-                    import json
-                    yield f"event: complete\ndata: {json.dumps(chunk)}\n\n"
-            
-        except Exception as e:
-            logger.error(f"Error in streaming chat: {e}")
-            import json
-            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+
+                prefix = _SSE_PREFIX.get(chunk.get('type'))
+                if prefix is not None:
+                    yield prefix + _dumps(chunk) + b'\n\n'
+        finally:
+            producer.cancel()
     
     return StreamingResponse(
         event_generator(),
@@ -328,24 +456,23 @@ async def search(request: SearchRequest):
         raise HTTPException(status_code=500, detail=f"Error processing search: {str(e)}")
 
 
-@app.post("/api/index")
-async def index_website(request: IndexRequest):
+async def _run_index(job_id: str, request: IndexRequest):
     """
-    Index a website by crawling and creating embeddings.
-    This is an async operation that runs in the background.
-    
+    Run a crawl + index job in the background, updating its job record
+    as it progresses.
+
     Args:
+        job_id: Identifier of the job record in index_jobs
         request: IndexRequest with URL and crawl parameters
-        
-    Returns:
-        Status message
     """
+    job = index_jobs[job_id]
+
     try:
         from utils.crawler import WebsiteCrawler
         from utils.js_crawler import JavaScriptWebsiteCrawler
-        
+
         logger.info(f"Starting website indexing: {request.url}")
-        
+
         # Create crawler
         if request.use_js_crawler:
             crawler = JavaScriptWebsiteCrawler(
@@ -362,29 +489,92 @@ async def index_website(request: IndexRequest):
                 max_pages=request.max_pages,
                 delay=0.5
             )
-        
-        # Crawl website
-        pages = await crawler.crawl()
-        logger.info(f"Crawled {len(pages)} pages")
-        
-        # Index pages
+
         chunk_size = int(os.getenv('CHUNK_SIZE', '1000'))
         chunk_overlap = int(os.getenv('CHUNK_OVERLAP', '200'))
-        
-        vector_store.index_pages(pages, chunk_size, chunk_overlap)
-        vector_store.save()
-        
+
+        if hasattr(crawler, 'crawl_stream'):
+            # Pipeline: index chunks while the crawl is still fetching
+            job['status'] = 'crawling'
+            await vector_store.index_pages_stream(
+                crawler.crawl_stream(), chunk_size, chunk_overlap
+            )
+            job['pages_crawled'] = len(crawler.pages)
+        else:
+            # Crawl website
+            job['status'] = 'crawling'
+            pages = await crawler.crawl()
+            job['pages_crawled'] = len(pages)
+            logger.info(f"Crawled {len(pages)} pages")
+
+            # Index pages (blocking Vertex/Chroma calls run in a thread)
+            job['status'] = 'indexing'
+            await asyncio.to_thread(vector_store.index_pages, pages, chunk_size, chunk_overlap)
+
+        await asyncio.to_thread(vector_store.save)
+
+        job['status'] = 'completed'
+        job['pages_indexed'] = len(crawler.pages)
         logger.info("Website indexed successfully")
-        
-        return {
-            "status": "success",
-            "message": f"Successfully indexed {len(pages)} pages from {request.url}",
-            "pages_indexed": len(pages)
-        }
-        
+
     except Exception as e:
         logger.error(f"Error indexing website: {e}")
-        raise HTTPException(status_code=500, detail=f"Error indexing website: {str(e)}")
+        job['status'] = 'failed'
+        job['error'] = str(e)
+
+
+@app.post("/api/index")
+async def index_website(request: IndexRequest):
+    """
+    Start indexing a website in the background.
+
+    Returns immediately with a job id; poll GET /api/index/{job_id}
+    for progress instead of holding the HTTP connection open for the
+    whole crawl + embed pipeline.
+
+    Args:
+        request: IndexRequest with URL and crawl parameters
+
+    Returns:
+        Job id and initial status
+    """
+    job_id = str(uuid4())
+    _prune_index_jobs()
+    index_jobs[job_id] = {
+        'job_id': job_id,
+        'url': request.url,
+        'status': 'pending',
+        'pages_crawled': 0,
+        'pages_indexed': 0,
+        'error': None
+    }
+
+    task = asyncio.create_task(_run_index(job_id, request))
+    _index_tasks[job_id] = task
+    task.add_done_callback(lambda _: _index_tasks.pop(job_id, None))
+
+    return {
+        "status": "started",
+        "job_id": job_id,
+        "message": f"Indexing of {request.url} started; poll /api/index/{job_id} for progress"
+    }
+
+
+@app.get("/api/index/{job_id}")
+async def index_status(job_id: str):
+    """
+    Get the status of an indexing job.
+
+    Args:
+        job_id: Job id returned by POST /api/index
+
+    Returns:
+        Job record with status and progress counters
+    """
+    job = index_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown indexing job: {job_id}")
+    return job
 
 
 @app.exception_handler(Exception)
@@ -405,11 +595,27 @@ if __name__ == "__main__":
     host = os.getenv('HOST', '0.0.0.0')
     
     logger.info(f"Starting server on {host}:{port}")
-    
+
+    # uvloop and httptools (bundled with uvicorn[standard]) cut
+    # event-loop scheduling and HTTP parsing overhead per request
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "auto"
+
     uvicorn.run(
         "api:app",
         host=host,
         port=port,
         reload=os.getenv('ENVIRONMENT', 'production') == 'development',
-        log_level="info"
+        log_level="info",
+        loop=loop_impl,
+        http=http_impl
     )
@@ -1,12 +1,16 @@
 """Utility module initialization."""
 
 from .crawler import WebsiteCrawler, WebPage
+from .embedding_cache import EmbeddingCache
+from .semantic_cache import SemanticCache
 from .vector_store import VectorStore, DocumentChunk
 from .vertex_chat_client import VertexAIChatClient, ChatMessage
 
 __all__ = [
     'WebsiteCrawler',
     'WebPage',
+    'EmbeddingCache',
+    'SemanticCache',
     'VectorStore',
     'DocumentChunk',
     'VertexAIChatClient',
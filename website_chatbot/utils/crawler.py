@@ -4,18 +4,80 @@ Crawls all pages from a given URL up to a specified depth.
 """
 
 import asyncio
+import functools
+import hashlib
+import re
 import aiohttp
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-from typing import Set, List, Dict
+from urllib.robotparser import RobotFileParser
+from typing import AsyncIterator, List, Optional, Set, Tuple
 import logging
 from dataclasses import dataclass
 
+# selectolax (C parser) is optional; BeautifulSoup is the fallback
+try:
+    from selectolax.parser import HTMLParser
+    _HAS_SELECTOLAX = True
+except ImportError:
+    _HAS_SELECTOLAX = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# File extensions that should never be crawled, as one compiled regex
+# instead of a per-link Python loop over suffixes
+_SKIP_RE = re.compile(r'\.(?:pdf|jpe?g|png|gif|zip|exe)$', re.IGNORECASE)
+
+# Collapse any whitespace run to a single space in one C-level pass
+_WS_RE = re.compile(r'\s+')
+
+# <loc> entries in sitemap XML (plain text extraction, no XML parser)
+_LOC_RE = re.compile(r'<loc>\s*(.*?)\s*</loc>', re.IGNORECASE | re.DOTALL)
+
+# Don't chase more nested sitemaps than this from a sitemap index
+_MAX_SITEMAPS = 10
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_url(url: str):
+    """Memoized urlparse - the same URLs recur across pages of a site."""
+    return urlparse(url)
+
+
+# Two near-duplicate pages may differ in up to this many SimHash bits
+_SIMHASH_BITS = 64
+_SIMHASH_MAX_DISTANCE = 3
+
 
-@dataclass
+def _simhash(text: str) -> int:
+    """
+    64-bit SimHash fingerprint over word trigrams of the text.
+
+    Near-duplicate pages (print views, tracking-param variants) land
+    within a few bits of each other, so a small Hamming distance flags
+    them without any external dependency.
+    """
+    weights = [0] * _SIMHASH_BITS
+    tokens = text.lower().split()
+
+    for i in range(max(len(tokens) - 2, 1)):
+        shingle = ' '.join(tokens[i:i + 3])
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(),
+            'big'
+        )
+        for bit in range(_SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit in range(_SIMHASH_BITS):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+@dataclass(slots=True)
 class WebPage:
     """Represents a crawled web page."""
     url: str
@@ -25,6 +87,31 @@ class WebPage:
     links: List[str]
 
 
+class _RateLimiter:
+    """
+    Spaces requests across the whole worker pool by a minimum interval,
+    replacing the per-request sleep that serialized the crawl.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_time = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until the next request slot is available."""
+        if self.interval <= 0:
+            return
+
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
 class WebsiteCrawler:
     """Crawls and indexes an entire website."""
     
@@ -33,58 +120,123 @@ class WebsiteCrawler:
         base_url: str, 
         max_depth: int = 3, 
         max_pages: int = 100,
-        delay: float = 0.5
+        delay: float = 0.5,
+        concurrency: int = 8
     ):
         """
         Initialize the website crawler.
-        
+
         Args:
             base_url: The starting URL to crawl
             max_depth: Maximum depth to crawl from base URL
             max_pages: Maximum number of pages to crawl
-            delay: Delay between requests in seconds
+            delay: Minimum interval between requests across all workers
+            concurrency: Number of concurrent crawl workers
         """
         self.base_url = base_url
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.delay = delay
+        self.concurrency = concurrency
         self.visited_urls: Set[str] = set()
         self.pages: List[WebPage] = []
         self.domain = urlparse(base_url).netloc
+        self._limiter = _RateLimiter(delay)
+        # Content fingerprints of stored pages, for duplicate skipping
+        self._seen_hashes: Set[bytes] = set()
+        self._seen_simhashes: List[int] = []
+        # Output queue used by crawl_stream to hand pages downstream
+        # while the crawl is still running
+        self._pages_out: Optional[asyncio.Queue] = None
+        # Parsed robots.txt rules, populated at crawl start
+        self._robots: Optional[RobotFileParser] = None
         
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and belongs to the same domain."""
         try:
-            parsed = urlparse(url)
+            parsed = _parse_url(url)
             # Only crawl URLs from the same domain
             if parsed.netloc != self.domain:
                 return False
             # Skip non-HTTP(S) URLs
-            if parsed.scheme not in ['http', 'https']:
+            if parsed.scheme not in ('http', 'https'):
                 return False
             # Skip common file extensions
-            skip_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.exe']
-            if any(url.lower().endswith(ext) for ext in skip_extensions):
+            if _SKIP_RE.search(parsed.path):
+                return False
+            # Respect robots.txt rules when the site declares any
+            if self._robots is not None and not self._robots.can_fetch('*', url):
                 return False
             return True
         except Exception:
             return False
     
+    def _parse_page(
+        self,
+        html: str,
+        url: str
+    ) -> Tuple[str, str, List[str], List[str]]:
+        """
+        Parse a page's HTML into title, text content, headings, and raw
+        link hrefs.
+
+        Uses selectolax's C parser when installed (~20x faster than the
+        stdlib parser); otherwise BeautifulSoup with lxml if available.
+
+        Args:
+            html: Raw page HTML
+            url: Page URL, used as the title fallback
+
+        Returns:
+            Tuple of (title, content, headings, hrefs)
+        """
+        if _HAS_SELECTOLAX:
+            tree = HTMLParser(html)
+
+            title_node = tree.css_first('title')
+            title = title_node.text(strip=True) if title_node else url
+            title = title or url
+
+            # Remove boilerplate before extracting text and links
+            for node in tree.css('script,style,nav,footer,header'):
+                node.decompose()
+
+            body = tree.body
+            content = body.text(separator=' ', strip=True) if body else ''
+
+            headings = [
+                text for node in tree.css('h1,h2,h3,h4,h5,h6')
+                if (text := node.text(strip=True))
+            ]
+
+            hrefs = [
+                href for node in tree.css('a[href]')
+                if (href := node.attributes.get('href'))
+            ]
+
+            return title, content, headings, hrefs
+
+        # BeautifulSoup fallback, preferring the lxml parser
+        try:
+            soup = BeautifulSoup(html, 'lxml')
+        except Exception:
+            soup = BeautifulSoup(html, 'html.parser')
+
+        title = soup.find('title').get_text().strip() if soup.find('title') else url
+        content = self._extract_text_content(soup)
+        headings = self._extract_headings(soup)
+        hrefs = [link['href'] for link in soup.find_all('a', href=True)]
+
+        return title, content, headings, hrefs
+
     def _extract_text_content(self, soup: BeautifulSoup) -> str:
         """Extract clean text content from HTML."""
         # Remove script and style elements
         for script in soup(["script", "style", "nav", "footer", "header"]):
             script.decompose()
-        
-        # Get text
-        text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text
+
+        # Get text and collapse whitespace in a single regex pass
+        return _WS_RE.sub(' ', soup.get_text(separator=' ')).strip()
     
     def _extract_headings(self, soup: BeautifulSoup) -> List[str]:
         """Extract all headings from the page."""
@@ -96,16 +248,15 @@ class WebsiteCrawler:
                     headings.append(text)
         return headings
     
-    async def _fetch_page(self, session: aiohttp.ClientSession, url: str) -> tuple[str, BeautifulSoup]:
-        """Fetch a single page and return its content."""
+    async def _fetch_page(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Fetch a single page and return its raw HTML."""
         try:
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
                 if response.status == 200:
-                    html = await response.text()
-                    return html, BeautifulSoup(html, 'html.parser')
+                    return await response.text()
         except Exception as e:
             logger.warning(f"Error fetching {url}: {e}")
-        return None, None
+        return None
     
     async def _crawl_page(
         self, 
@@ -126,72 +277,279 @@ class WebsiteCrawler:
         
         self.visited_urls.add(url)
         logger.info(f"Crawling: {url} (depth: {depth}, pages: {len(self.pages)})")
-        
-        html, soup = await self._fetch_page(session, url)
-        if not soup:
+
+        # Rate limit across the whole pool, then fetch
+        await self._limiter.acquire()
+        html = await self._fetch_page(session, url)
+        if not html:
             return []
-        
-        # Extract page information
-        title = soup.find('title').get_text().strip() if soup.find('title') else url
-        content = self._extract_text_content(soup)
-        headings = self._extract_headings(soup)
-        
-        # Extract all links
+
+        # Extract page information and content fingerprints in a thread
+        # so CPU-bound parsing and hashing don't stall the other fetch
+        # workers (lxml/selectolax release the GIL while parsing)
+        title, content, headings, hrefs, content_hash, fingerprint = (
+            await asyncio.to_thread(self._parse_and_fingerprint, html, url)
+        )
+
+        # Duplicate boilerplate pages are crawled for their links but
+        # not stored or indexed
+        store_page = not self._is_duplicate_content(content_hash, fingerprint, url)
+
+        # Extract all links. Bind the per-iteration lookups to locals
+        # once - this loop runs for every link on every page.
         links = []
         new_urls = []
-        for link in soup.find_all('a', href=True):
-            absolute_url = urljoin(url, link['href'])
+        append_link = links.append
+        append_new = new_urls.append
+        is_valid = self._is_valid_url
+        visited = self.visited_urls
+        under_page_limit = len(self.pages) < self.max_pages
+
+        for href in hrefs:
+            absolute_url = urljoin(url, href)
             # Remove fragments
-            absolute_url = absolute_url.split('#')[0]
-            links.append(absolute_url)
-            
-            if (self._is_valid_url(absolute_url) and 
-                absolute_url not in self.visited_urls and
-                len(self.pages) < self.max_pages):
-                new_urls.append(absolute_url)
+            absolute_url = absolute_url.split('#', 1)[0]
+            append_link(absolute_url)
+
+            if (under_page_limit and
+                absolute_url not in visited and
+                is_valid(absolute_url)):
+                append_new(absolute_url)
         
         # Store page data
-        page = WebPage(
-            url=url,
-            title=title,
-            content=content,
-            headings=headings,
-            links=list(set(links))
-        )
-        self.pages.append(page)
-        
-        # Add delay to be respectful
-        await asyncio.sleep(self.delay)
-        
+        if store_page:
+            page = WebPage(
+                url=url,
+                title=title,
+                content=content,
+                headings=headings,
+                links=list(set(links))
+            )
+            self.pages.append(page)
+            if self._pages_out is not None:
+                self._pages_out.put_nowait(page)
+
         return new_urls
-    
-    async def crawl(self) -> List[WebPage]:
+
+    def _parse_and_fingerprint(
+        self,
+        html: str,
+        url: str
+    ) -> Tuple[str, str, List[str], List[str], bytes, int]:
         """
-        Crawl the website starting from base_url.
-        
+        Parse a page and compute its content fingerprints in one call,
+        so the whole CPU-bound pass runs in a single worker thread.
+
+        Args:
+            html: Raw page HTML
+            url: Page URL, used as the title fallback
+
         Returns:
-            List of WebPage objects
+            Tuple of (title, content, headings, hrefs, SHA-256 digest,
+            SimHash fingerprint)
         """
-        logger.info(f"Starting crawl of {self.base_url}")
-        
-        async with aiohttp.ClientSession() as session:
-            # Start with the base URL
-            urls_to_crawl = [(self.base_url, 0)]  # (url, depth)
-            
-            while urls_to_crawl and len(self.pages) < self.max_pages:
-                url, depth = urls_to_crawl.pop(0)
-                
-                if url in self.visited_urls:
+        title, content, headings, hrefs = self._parse_page(html, url)
+        content_hash = hashlib.sha256(content.encode('utf-8')).digest()
+        fingerprint = _simhash(content)
+        return title, content, headings, hrefs, content_hash, fingerprint
+
+    def _is_duplicate_content(self, content_hash: bytes, fingerprint: int, url: str) -> bool:
+        """
+        Check whether a page's precomputed fingerprints duplicate an
+        already-stored page, exactly (SHA-256) or nearly (SimHash
+        Hamming distance).
+
+        Fingerprints of novel pages are recorded as a side effect; the
+        seen-set updates stay on the event loop, so no locking is
+        needed. The pairwise Hamming scan is O(pages^2) over the whole
+        crawl - fine at the default max_pages=100.
+        """
+        if content_hash in self._seen_hashes:
+            logger.info(f"Skipping exact duplicate content: {url}")
+            return True
+
+        for seen in self._seen_simhashes:
+            if bin(fingerprint ^ seen).count('1') <= _SIMHASH_MAX_DISTANCE:
+                logger.info(f"Skipping near-duplicate content: {url}")
+                return True
+
+        self._seen_hashes.add(content_hash)
+        self._seen_simhashes.append(fingerprint)
+        return False
+
+    async def _fetch_text(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Fetch a URL's body as text, or None on any failure."""
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    return await response.text()
+        except Exception as e:
+            logger.debug(f"Could not fetch {url}: {e}")
+        return None
+
+    async def _seed_from_sitemap(
+        self,
+        session: aiohttp.ClientSession,
+        queue: asyncio.Queue
+    ) -> int:
+        """
+        Load robots.txt rules and seed the frontier from declared
+        sitemaps, so the crawl starts from the site's canonical URL list
+        instead of rediscovering it link by link.
+
+        Args:
+            session: Shared HTTP session
+            queue: Crawl frontier to seed
+
+        Returns:
+            Number of sitemap URLs queued (0 means BFS-only crawl)
+        """
+        parsed_base = _parse_url(self.base_url)
+        root = f"{parsed_base.scheme}://{self.domain}"
+
+        sitemap_urls = []
+        robots_txt = await self._fetch_text(session, f"{root}/robots.txt")
+        if robots_txt:
+            parser = RobotFileParser()
+            parser.parse(robots_txt.splitlines())
+            self._robots = parser
+            sitemap_urls = [
+                line.split(':', 1)[1].strip()
+                for line in robots_txt.splitlines()
+                if line.lower().startswith('sitemap:')
+            ]
+
+        if not sitemap_urls:
+            sitemap_urls = [f"{root}/sitemap.xml"]
+
+        seeded = 0
+        pending = list(sitemap_urls)
+        fetched = 0
+
+        while pending and fetched < _MAX_SITEMAPS:
+            sitemap_url = pending.pop(0)
+            fetched += 1
+
+            xml = await self._fetch_text(session, sitemap_url)
+            if not xml:
+                continue
+
+            for loc in _LOC_RE.findall(xml):
+                # Sitemap indexes list nested sitemaps as <loc>s too
+                if loc.endswith('.xml'):
+                    pending.append(loc)
+                elif self._is_valid_url(loc) and loc not in self.visited_urls:
+                    queue.put_nowait((loc, 0))
+                    seeded += 1
+
+        if seeded:
+            logger.info(f"Seeded {seeded} URLs from sitemap(s)")
+        return seeded
+
+    async def _worker(
+        self,
+        session: aiohttp.ClientSession,
+        queue: asyncio.Queue
+    ) -> None:
+        """Crawl worker: pull URLs from the queue until cancelled."""
+        while True:
+            url, depth = await queue.get()
+            try:
+                if url in self.visited_urls or len(self.pages) >= self.max_pages:
                     continue
-                
+
                 new_urls = await self._crawl_page(session, url, depth)
-                
+
                 # Add new URLs with incremented depth
                 for new_url in new_urls:
                     if new_url not in self.visited_urls:
-                        urls_to_crawl.append((new_url, depth + 1))
-        
+                        queue.put_nowait((new_url, depth + 1))
+            except Exception as e:
+                logger.warning(f"Error crawling {url}: {e}")
+            finally:
+                queue.task_done()
+
+    async def crawl_stream(self) -> AsyncIterator[WebPage]:
+        """
+        Crawl the website, yielding pages as they are fetched.
+
+        Pages are fetched by a pool of concurrent workers sharing one
+        HTTP session, so wall-clock time is bounded by concurrency
+        rather than the sum of serial round-trips. Yielding pages while
+        the crawl runs lets downstream indexing overlap with fetching.
+
+        Yields:
+            WebPage objects in crawl completion order
+        """
+        logger.info(f"Starting crawl of {self.base_url}")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait((self.base_url, 0))
+        pages_out: asyncio.Queue = asyncio.Queue()
+        self._pages_out = pages_out
+
+        # Reuse keep-alive connections and cached DNS lookups across the
+        # whole crawl instead of paying TLS/DNS per page
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.concurrency,
+            limit=2 * self.concurrency,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
+
+        # Ask for compressed transfers; aiohttp decompresses gzip
+        # natively and brotli when the brotli package is installed
+        headers = {
+            'Accept-Encoding': 'gzip, br',
+            'User-Agent': 'website-chatbot-crawler/1.0'
+        }
+
+        try:
+            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+                # Prefer the site's declared sitemap over blind BFS; the
+                # base URL stays queued either way
+                await self._seed_from_sitemap(session, queue)
+
+                workers = [
+                    asyncio.create_task(self._worker(session, queue))
+                    for _ in range(self.concurrency)
+                ]
+
+                async def finish():
+                    # Wait until every queued URL has been processed,
+                    # stop the (now idle) workers, then close the stream
+                    await queue.join()
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    pages_out.put_nowait(None)
+
+                finisher = asyncio.create_task(finish())
+
+                while True:
+                    page = await pages_out.get()
+                    if page is None:
+                        break
+                    yield page
+
+                await finisher
+        finally:
+            self._pages_out = None
+
         logger.info(f"Crawl complete. Indexed {len(self.pages)} pages")
+
+    async def crawl(self) -> List[WebPage]:
+        """
+        Crawl the website starting from base_url.
+
+        Convenience wrapper over crawl_stream for callers that want the
+        full page list.
+
+        Returns:
+            List of WebPage objects
+        """
+        async for _ in self.crawl_stream():
+            pass
         return self.pages
 
 
@@ -0,0 +1,106 @@
+"""
+Persistent embedding cache keyed by content hash.
+Lets re-indexing skip Vertex AI calls for chunks whose text is
+byte-identical to something embedded in a previous run.
+"""
+
+import hashlib
+import logging
+import sqlite3
+from typing import Dict, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stay well under SQLite's bound-parameter limit per statement
+_SQL_BATCH = 500
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    """
+    Cache key for a (model, text) pair.
+
+    Args:
+        model_name: Embedding model the vector belongs to
+        text: Chunk text
+
+    Returns:
+        32-byte SHA-256 digest
+    """
+    return hashlib.sha256(
+        (model_name + "\0" + text).encode('utf-8')
+    ).digest()
+
+
+class EmbeddingCache:
+    """SQLite-backed cache mapping content hashes to embedding vectors."""
+
+    def __init__(self, path: str = "embedding_cache.db"):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, "
+            "vector BLOB NOT NULL, "
+            "dim INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Fetch cached vectors for the given keys.
+
+        Args:
+            keys: Content keys to look up
+
+        Returns:
+            Dict mapping each found key to its embedding vector; missing
+            keys are simply absent
+        """
+        keys = list(keys)
+        found: Dict[bytes, np.ndarray] = {}
+
+        for i in range(0, len(keys), _SQL_BATCH):
+            batch = keys[i:i + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, vector, dim FROM embeddings "
+                f"WHERE key IN ({placeholders})",
+                batch
+            ).fetchall()
+            for key, blob, dim in rows:
+                # Vectors are stored fp16; float32 rows from older
+                # cache files are recognized by their byte length
+                if len(blob) == dim * 2:
+                    vec = np.frombuffer(blob, dtype=np.float16, count=dim)
+                    found[key] = vec.astype(np.float32)
+                else:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """
+        Store embedding vectors under their content keys.
+
+        Args:
+            items: Dict mapping content keys to embedding vectors
+        """
+        # fp16 halves on-disk size and read bandwidth; well within the
+        # precision needed for cosine similarity over unit vectors
+        rows = [
+            (key, np.asarray(vec, dtype=np.float16).tobytes(), len(vec))
+            for key, vec in items.items()
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, dim) "
+            "VALUES (?, ?, ?)",
+            rows
+        )
+        self._conn.commit()
@@ -4,18 +4,26 @@ Uses Playwright for rendering JavaScript content.
 """
 
 import asyncio
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from typing import Set, List, Dict
+import functools
+import re
+from urllib.parse import urlparse
+from typing import List, Optional, Set, Tuple
 import logging
 from dataclasses import dataclass
 from playwright.async_api import async_playwright, Page, Browser
 
+# ada-url (C++ WHATWG parser) is optional; urllib.parse is the fallback
+try:
+    import ada_url
+    _HAS_ADA = True
+except ImportError:
+    _HAS_ADA = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class WebPage:
     """Represents a crawled web page."""
     url: str
@@ -25,6 +33,160 @@ class WebPage:
     links: List[str]
 
 
+# Collapses runs of whitespace in one C regex pass
+_WS_RE = re.compile(r'\s+')
+
+# File extensions that should never be crawled; a tuple so the check is
+# one C-level str.endswith call
+_SKIP_EXTS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.exe', '.mp4', '.mp3')
+
+
+@functools.lru_cache(maxsize=100_000)
+def _url_parts(url: str) -> Tuple[str, str]:
+    """
+    Memoized (netloc, scheme) for a URL - the same URLs recur across
+    pages of a site.
+
+    Uses the ada C++ WHATWG parser when installed, which is an order of
+    magnitude faster than urllib.parse; falls back to urlparse.
+    """
+    if _HAS_ADA:
+        parsed = ada_url.parse_url(url)
+        return parsed.get('host', ''), parsed.get('protocol', '').rstrip(':')
+    parsed = urlparse(url)
+    return parsed.netloc, parsed.scheme
+
+
+@functools.lru_cache(maxsize=100_000)
+def _canonicalize(url: str) -> str:
+    """
+    Canonical form of a URL for dedup: lowercase scheme and host, no
+    trailing slash, query parameters kept in sorted order. Same-page
+    variants collapse to one frontier entry, so each is rendered at
+    most once - but distinct queries (?page=2 vs ?page=3) stay
+    distinct, since query-routed sites serve different content per
+    parameter set.
+    """
+    try:
+        if _HAS_ADA:
+            parsed = ada_url.parse_url(url)
+            scheme = parsed.get('protocol', '').rstrip(':').lower()
+            host = parsed.get('host', '').lower()
+            path = parsed.get('pathname', '')
+            query = parsed.get('search', '').lstrip('?')
+        else:
+            parsed = urlparse(url)
+            scheme = parsed.scheme.lower()
+            host = parsed.netloc.lower()
+            path = parsed.path
+            query = parsed.query
+        canon = scheme + '://' + host + path.rstrip('/')
+        if query:
+            canon += '?' + '&'.join(sorted(query.split('&')))
+        return canon
+    except Exception:
+        return url
+
+
+@functools.lru_cache(maxsize=100_000)
+def _check_url(url: str, domain: str) -> bool:
+    """
+    Cached URL validity check.
+
+    Module-level and keyed by (url, domain) rather than an instance
+    method so the lru_cache isn't defeated (or leaked) by self.
+    """
+    try:
+        netloc, scheme = _url_parts(url)
+        # Only crawl URLs from the same domain
+        if netloc and netloc != domain:
+            return False
+        # Skip non-HTTP(S) URLs
+        if scheme and scheme not in ('http', 'https'):
+            return False
+        # Skip common file extensions
+        if url.lower().endswith(_SKIP_EXTS):
+            return False
+        # Skip anchors with just hash
+        if url.startswith('#'):
+            return False
+        return True
+    except Exception:
+        return False
+
+
+# In-page extraction script: strips boilerplate, then returns only the
+# text, headings, and links the crawler keeps. a.href is already
+# absolute, so no URL resolution is needed on the Python side.
+_EXTRACT_JS = """
+() => {
+  for (const s of document.querySelectorAll('script,style,nav,footer,header,noscript')) s.remove();
+  return {
+    title: document.title,
+    text: document.body?.innerText ?? '',
+    headings: Array.from(document.querySelectorAll('h1,h2,h3,h4,h5,h6'), h => h.innerText.trim()).filter(t => t.length > 1),
+    links: Array.from(document.querySelectorAll('a[href]'), a => a.href),
+  };
+}
+"""
+
+
+# Shared Playwright driver and browser, launched once per process so
+# crawls pay Chromium startup a single time and share its memory
+_playwright = None
+_browser: Optional[Browser] = None
+_browser_lock = asyncio.Lock()
+
+
+async def get_browser(headless: bool = True) -> Browser:
+    """
+    Return the shared Chromium instance, launching it on first use.
+
+    Each crawl should create its own context on this browser and close
+    only that context when done.
+
+    Args:
+        headless: Whether to launch the browser headless (first call only)
+
+    Returns:
+        The shared Browser instance
+    """
+    global _playwright, _browser
+
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(headless=headless)
+            logger.info("Launched shared Chromium browser")
+        return _browser
+
+
+# Resource types the crawler never needs - only text, headings, and
+# links are kept, so rendering these is wasted bandwidth and layout
+_BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+
+
+async def _block_heavy_resources(route) -> None:
+    """Abort requests for resources the text crawl doesn't use."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def shutdown_browser() -> None:
+    """Close the shared browser and Playwright driver, if running."""
+    global _playwright, _browser
+
+    async with _browser_lock:
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+
+
 class JavaScriptWebsiteCrawler:
     """Crawls and indexes JavaScript-heavy websites using Playwright."""
     
@@ -34,108 +196,55 @@ class JavaScriptWebsiteCrawler:
         max_depth: int = 3, 
         max_pages: int = 100,
         delay: float = 1.0,
-        headless: bool = True
+        headless: bool = True,
+        concurrency: int = 8,
+        page_timeout_ms: int = 5000
     ):
         """
         Initialize the website crawler.
-        
+
         Args:
             base_url: The starting URL to crawl
             max_depth: Maximum depth to crawl from base URL
             max_pages: Maximum number of pages to crawl
             delay: Delay between requests in seconds
             headless: Run browser in headless mode
+            concurrency: Number of pages rendered in parallel
+            page_timeout_ms: Per-page navigation/load timeout
         """
         self.base_url = base_url
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.delay = delay
         self.headless = headless
+        self.concurrency = concurrency
+        self.page_timeout_ms = page_timeout_ms
         self.visited_urls: Set[str] = set()
+        # Canonical forms of every URL ever enqueued, so same-page
+        # variants never produce a second frontier entry
+        self._enqueued: Set[str] = set()
         self.pages: List[WebPage] = []
         self.domain = urlparse(base_url).netloc
         
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and belongs to the same domain."""
-        try:
-            parsed = urlparse(url)
-            # Only crawl URLs from the same domain
-            if parsed.netloc and parsed.netloc != self.domain:
-                return False
-            # Skip non-HTTP(S) URLs
-            if parsed.scheme and parsed.scheme not in ['http', 'https']:
-                return False
-            # Skip common file extensions
-            skip_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.exe', '.mp4', '.mp3']
-            if any(url.lower().endswith(ext) for ext in skip_extensions):
-                return False
-            # Skip anchors with just hash
-            if url.startswith('#'):
-                return False
-            return True
-        except Exception:
-            return False
-    
-    def _extract_text_content(self, soup: BeautifulSoup) -> str:
-        """Extract clean text content from HTML."""
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header", "noscript"]):
-            script.decompose()
-        
-        # Get text
-        text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text
-    
-    def _extract_headings(self, soup: BeautifulSoup) -> List[str]:
-        """Extract all headings from the page."""
-        headings = []
-        for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            for heading in soup.find_all(tag):
-                text = heading.get_text().strip()
-                if text and len(text) > 1:  # Filter out empty or single-char headings
-                    headings.append(text)
-        return headings
+        return _check_url(url, self.domain)
     
     async def _wait_for_page_load(self, page: Page):
-        """Wait for page to be fully loaded including dynamic content."""
-        try:
-            # Wait for network to be idle
-            await page.wait_for_load_state("networkidle", timeout=10000)
-            # Give extra time for React/Vue to render
-            await asyncio.sleep(0.5)
-        except Exception as e:
-            logger.warning(f"Timeout waiting for page load: {e}")
-    
-    async def _extract_links(self, page: Page, current_url: str) -> List[str]:
-        """Extract all links from the page."""
-        links = []
+        """
+        Wait for the DOM to be usable.
+
+        networkidle adds a multi-second floor on most pages, so wait
+        only for the body to attach and fall back to the load event for
+        pages that render nothing by then.
+        """
         try:
-            # Get all anchor tags
-            link_elements = await page.query_selector_all('a[href]')
-            
-            for element in link_elements:
-                try:
-                    href = await element.get_attribute('href')
-                    if href:
-                        # Resolve relative URLs
-                        absolute_url = urljoin(current_url, href)
-                        # Remove fragments
-                        absolute_url = absolute_url.split('#')[0]
-                        
-                        if self._is_valid_url(absolute_url):
-                            links.append(absolute_url)
-                except Exception:
-                    continue
-        except Exception as e:
-            logger.warning(f"Error extracting links: {e}")
-        
-        return list(set(links))  # Remove duplicates
+            await page.wait_for_selector('body', state='attached', timeout=3000)
+        except Exception:
+            try:
+                await page.wait_for_load_state('load', timeout=self.page_timeout_ms)
+            except Exception as e:
+                logger.warning(f"Timeout waiting for page load: {e}")
     
     async def _crawl_page(
         self, 
@@ -159,7 +268,9 @@ class JavaScriptWebsiteCrawler:
         
         try:
             # Navigate to the page
-            response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            response = await page.goto(
+                url, wait_until="domcontentloaded", timeout=self.page_timeout_ms
+            )
             
             if not response or response.status >= 400:
                 logger.warning(f"Failed to load {url}: status {response.status if response else 'unknown'}")
@@ -167,21 +278,25 @@ class JavaScriptWebsiteCrawler:
             
             # Wait for page to fully load
             await self._wait_for_page_load(page)
-            
-            # Get the rendered HTML
-            html = await page.content()
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extract page information
-            title_element = await page.query_selector('title')
-            title = await title_element.inner_text() if title_element else url
-            
-            content = self._extract_text_content(soup)
-            headings = self._extract_headings(soup)
-            
-            # Extract all links
-            links = await self._extract_links(page, url)
-            
+
+            # Extract everything in one evaluate: serializing the full
+            # DOM back with page.content() and re-parsing it in Python
+            # is a double parse and a large-string transfer, while this
+            # ships only the final text and heading/link arrays over CDP
+            extracted = await page.evaluate(_EXTRACT_JS)
+
+            title = (extracted.get('title') or '').strip() or url
+            # innerText keeps layout newlines; collapse all whitespace
+            # in a single regex pass
+            content = _WS_RE.sub(' ', extracted.get('text') or '').strip()
+            headings = extracted.get('headings') or []
+
+            links = list({
+                href.split('#', 1)[0]
+                for href in extracted.get('links') or []
+                if self._is_valid_url(href.split('#', 1)[0])
+            })
+
             # Filter new URLs to crawl
             new_urls = [
                 link for link in links
@@ -191,7 +306,7 @@ class JavaScriptWebsiteCrawler:
             # Store page data
             page_data = WebPage(
                 url=url,
-                title=title.strip() if title else url,
+                title=title,
                 content=content,
                 headings=headings,
                 links=links
@@ -219,37 +334,80 @@ class JavaScriptWebsiteCrawler:
         logger.info(f"Starting JavaScript-aware crawl of {self.base_url}")
         logger.info(f"Max depth: {self.max_depth}, Max pages: {self.max_pages}")
         
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=self.headless)
-            context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        # Reuse the shared browser; only this crawl's context is closed
+        browser = await get_browser(headless=self.headless)
+        context = await browser.new_context(
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            viewport={'width': 800, 'height': 600},
+            ignore_https_errors=True
+        )
+
+        # Most page bytes are images/media/fonts/styles the text crawl
+        # never reads - abort them before they transfer
+        await context.route('**/*', _block_heavy_resources)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._enqueued.add(_canonicalize(self.base_url))
+        queue.put_nowait((self.base_url, 0))
+
+        # A pool of workers, each driving its own tab, renders pages
+        # in parallel instead of one at a time
+        workers = [
+            asyncio.create_task(self._worker(context, queue))
+            for _ in range(self.concurrency)
+        ]
+        join_task = asyncio.create_task(queue.join())
+
+        try:
+            # Wait for the frontier to drain, but also watch the
+            # workers: a worker that dies (e.g. the browser crashed
+            # before its tab opened) stops calling task_done(), and
+            # with every worker dead the join would never finish -
+            # fail the crawl instead of deadlocking on it
+            done, _ = await asyncio.wait(
+                [join_task, *workers],
+                return_when=asyncio.FIRST_COMPLETED
             )
-            page = await context.new_page()
-            
+
+            if join_task not in done:
+                failed = done.pop()
+                raise failed.exception() or RuntimeError(
+                    "crawl worker exited unexpectedly"
+                )
+        finally:
+            join_task.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await context.close()
+
+        logger.info(f"Crawl complete. Indexed {len(self.pages)} pages")
+        return self.pages
+
+    async def _worker(self, context, queue: asyncio.Queue) -> None:
+        """Crawl worker: drives its own tab until cancelled."""
+        page = await context.new_page()
+
+        while True:
+            url, depth = await queue.get()
             try:
-                # Start with the base URL
-                urls_to_crawl = [(self.base_url, 0)]  # (url, depth)
-                
-                while urls_to_crawl and len(self.pages) < self.max_pages:
-                    url, depth = urls_to_crawl.pop(0)
-                    
-                    if url in self.visited_urls:
+                if url in self.visited_urls or len(self.pages) >= self.max_pages:
+                    continue
+
+                new_urls = await self._crawl_page(page, url, depth)
+
+                # Add new URLs with incremented depth, deduplicating on
+                # canonical form so URL variants aren't rendered twice
+                for new_url in new_urls:
+                    canon = _canonicalize(new_url)
+                    if canon in self._enqueued:
                         continue
-                    
-                    new_urls = await self._crawl_page(page, url, depth)
-                    
-                    # Add new URLs with incremented depth
-                    for new_url in new_urls:
-                        if new_url not in self.visited_urls:
-                            urls_to_crawl.append((new_url, depth + 1))
-                
+                    self._enqueued.add(canon)
+                    queue.put_nowait((new_url, depth + 1))
+            except Exception as e:
+                logger.warning(f"Error crawling {url}: {e}")
             finally:
-                await context.close()
-                await browser.close()
-        
-        logger.info(f"Crawl complete. Indexed {len(self.pages)} pages")
-        return self.pages
+                queue.task_done()
 
 
 async def main():
@@ -0,0 +1,92 @@
+"""
+Top-k selection helpers for similarity search.
+Provides an optional Numba-compiled heap top-k that touches each score
+once (O(N log k)) instead of argpartition's full-array pass.
+"""
+
+import logging
+
+import numpy as np
+
+# Numba is optional; the NumPy argpartition path is the fallback
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+logger = logging.getLogger(__name__)
+
+# Below this many scores, argpartition wins over the JIT'd heap
+NUMBA_MIN_SIZE = 2000
+
+
+if _HAS_NUMBA:
+
+    @numba.njit(cache=True, fastmath=True)
+    def _topk_heap(scores, k):
+        """Min-heap of size k over scores; returns indices, best first."""
+        heap_scores = np.empty(k, dtype=np.float32)
+        heap_idx = np.empty(k, dtype=np.int64)
+        size = 0
+
+        for i in range(scores.shape[0]):
+            s = scores[i]
+
+            if size < k:
+                # Push and sift up
+                j = size
+                heap_scores[j] = s
+                heap_idx[j] = i
+                size += 1
+                while j > 0:
+                    parent = (j - 1) // 2
+                    if heap_scores[j] < heap_scores[parent]:
+                        heap_scores[j], heap_scores[parent] = heap_scores[parent], heap_scores[j]
+                        heap_idx[j], heap_idx[parent] = heap_idx[parent], heap_idx[j]
+                        j = parent
+                    else:
+                        break
+            elif s > heap_scores[0]:
+                # Replace the root and sift down
+                heap_scores[0] = s
+                heap_idx[0] = i
+                j = 0
+                while True:
+                    left = 2 * j + 1
+                    right = left + 1
+                    smallest = j
+                    if left < size and heap_scores[left] < heap_scores[smallest]:
+                        smallest = left
+                    if right < size and heap_scores[right] < heap_scores[smallest]:
+                        smallest = right
+                    if smallest == j:
+                        break
+                    heap_scores[j], heap_scores[smallest] = heap_scores[smallest], heap_scores[j]
+                    heap_idx[j], heap_idx[smallest] = heap_idx[smallest], heap_idx[j]
+                    j = smallest
+
+        order = np.argsort(-heap_scores[:size])
+        return heap_idx[:size][order]
+
+
+def topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the indices of the k highest scores, highest first.
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of indices to return
+
+    Returns:
+        Array of indices sorted by descending score
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if _HAS_NUMBA and len(scores) > NUMBA_MIN_SIZE:
+        return _topk_heap(np.ascontiguousarray(scores, dtype=np.float32), k)
+
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
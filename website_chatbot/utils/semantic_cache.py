@@ -0,0 +1,130 @@
+"""
+Semantic cache for query -> answer mappings.
+Caches generated answers keyed by query embedding so repeated or
+near-duplicate questions skip vector search and generation entirely.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    LRU cache keyed by cosine similarity of query embeddings.
+
+    Entries expire after a TTL and the least recently used entry is
+    evicted when the cache is full. Lookups compare the incoming query
+    embedding against all cached key embeddings in a single vectorized
+    NumPy operation.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl_seconds: float = 300.0,
+        threshold: float = 0.95
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            max_size: Maximum number of cached entries
+            ttl_seconds: Time-to-live for each entry in seconds
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+
+        # query -> (embedding, response, timestamp)
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, Dict, float]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+        # Simple hit/miss statistics
+        self.hits = 0
+        self.misses = 0
+
+    def _evict_expired(self) -> None:
+        """Remove entries older than the TTL. Caller must hold the lock."""
+        now = time.time()
+        expired = [
+            key for key, (_, _, ts) in self._entries.items()
+            if now - ts > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    async def lookup(self, embedding: np.ndarray) -> Optional[Dict]:
+        """
+        Look up a cached response for a query embedding.
+
+        Args:
+            embedding: Embedding vector of the incoming query
+
+        Returns:
+            The cached response if the most similar cached query is
+            above the similarity threshold, otherwise None
+        """
+        embedding = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(embedding))
+
+        async with self._lock:
+            self._evict_expired()
+
+            if not self._entries or query_norm == 0.0:
+                self.misses += 1
+                return None
+
+            # Stack cached key vectors and score them in one pass
+            keys = list(self._entries.keys())
+            vectors = np.stack([entry[0] for entry in self._entries.values()])
+            norms = np.linalg.norm(vectors, axis=1)
+            scores = (vectors @ embedding) / (norms * query_norm + 1e-12)
+
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                key = keys[best]
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Semantic cache hit (similarity: {scores[best]:.4f})")
+                return self._entries[key][1]
+
+            self.misses += 1
+            return None
+
+    async def put(self, query: str, embedding: np.ndarray, response: Dict) -> None:
+        """
+        Store a response in the cache.
+
+        Args:
+            query: The original query text (used as the cache key)
+            embedding: Embedding vector of the query
+            response: Response to cache
+        """
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if float(np.linalg.norm(embedding)) == 0.0:
+            # Zero vectors come from failed embedding calls - don't cache them
+            return
+
+        async with self._lock:
+            self._entries[query] = (embedding, response, time.time())
+            self._entries.move_to_end(query)
+
+            # Evict least recently used entries on overflow
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Return cache statistics."""
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,47 @@
+"""
+Token counting helpers for prompt budgeting.
+Uses the local Vertex AI tokenizer when available and falls back to a
+character-based estimate.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Local tokenization is only available in newer SDK versions
+try:
+    from vertexai.tokenization import get_tokenizer_for_model
+    _HAS_TOKENIZER = True
+except ImportError:
+    _HAS_TOKENIZER = False
+
+_tokenizer = None
+
+# Rough characters-per-token ratio for the fallback estimate
+_CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str, model_name: str = "gemini-1.5-pro") -> int:
+    """
+    Count (or estimate) the number of tokens in a text.
+
+    Args:
+        text: Text to count tokens for
+        model_name: Model whose tokenizer to use when available
+
+    Returns:
+        Token count, or a character-based estimate if no local
+        tokenizer is available
+    """
+    global _tokenizer, _HAS_TOKENIZER
+
+    if _HAS_TOKENIZER:
+        try:
+            if _tokenizer is None:
+                _tokenizer = get_tokenizer_for_model(model_name)
+            return _tokenizer.count_tokens(text).total_tokens
+        except Exception as e:
+            logger.debug(f"Local tokenizer unavailable, using estimate: {e}")
+            _HAS_TOKENIZER = False
+
+    return max(1, len(text) // _CHARS_PER_TOKEN)
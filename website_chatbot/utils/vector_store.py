@@ -3,8 +3,13 @@ Vector store module for embedding and searching website content.
 Uses Google Vertex AI for embeddings and ChromaDB Cloud for vector storage.
 """
 
+import asyncio
+import functools
 import json
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import logging
@@ -17,13 +22,77 @@ from google.oauth2 import service_account
 import vertexai
 from vertexai.language_models import TextEmbeddingModel
 
+from utils.embedding_cache import EmbeddingCache, content_key
+from utils.selection import topk
+
+# Optional hand-tuned SIMD similarity kernels; NumPy path is the fallback
+try:
+    import simsimd
+    _HAS_SIMSIMD = True
+except ImportError:
+    _HAS_SIMSIMD = False
+
+# Optional columnar storage for chunk metadata; a Python list of
+# DocumentChunk objects is the fallback
+try:
+    import pyarrow as pa
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# Optional HNSW approximate-nearest-neighbor index; the brute-force
+# local scan is the fallback
+try:
+    import hnswlib
+    _HAS_HNSWLIB = True
+except ImportError:
+    _HAS_HNSWLIB = False
+
+# Below this many vectors the brute-force scan beats HNSW overhead
+_HNSW_MIN_SIZE = 10000
+
+# Sentence-boundary characters used when splitting text into chunks
+_BOUNDARY_RE = re.compile(r'[.\n]')
+
+# Concurrent embedding requests in flight; Vertex quotas are per-minute
+_EMBED_WORKERS = 8
+
+
+class _ZeroEmbedding(Exception):
+    """Signals a zero-vector embedding fallback that must not be cached."""
+
+    def __init__(self, vector: np.ndarray):
+        super().__init__("embedding unavailable")
+        self.vector = vector
+
+
+def _normalize_fp16(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize embedding rows and cast to float16.
+
+    Half precision halves the in-process working set with negligible
+    recall loss; normalizing first preserves cosine similarity exactly.
+    Callers that hand vectors to ChromaDB cast back to float32 at that
+    boundary.
+    """
+    arr = np.asarray(embeddings, dtype=np.float32)
+    if arr.size == 0:
+        return arr.astype(np.float16)
+    norms = np.linalg.norm(arr, axis=-1, keepdims=True)
+    np.divide(arr, norms, out=arr, where=norms > 0)
+    return arr.astype(np.float16)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class DocumentChunk:
     """Represents a chunk of text with metadata."""
-    
+
+    # Fixed attribute layout avoids a per-instance __dict__, which adds
+    # up when an index holds tens of thousands of chunks
+    __slots__ = ('text', 'url', 'title', 'heading', 'chunk_id')
+
     def __init__(
         self, 
         text: str, 
@@ -33,8 +102,10 @@ class DocumentChunk:
         chunk_id: int = 0
     ):
         self.text = text
-        self.url = url
-        self.title = title
+        # url/title repeat across every chunk of a page; interning keeps
+        # one copy per distinct string instead of thousands
+        self.url = sys.intern(url)
+        self.title = sys.intern(title)
         self.heading = heading
         self.chunk_id = chunk_id
     
@@ -60,6 +131,54 @@ class DocumentChunk:
         )
 
 
+class _LocalIndex:
+    """
+    Immutable snapshot of the local fast-search structures.
+
+    Vectors are int8-quantized (symmetric, per-row scale) to cut memory
+    and scan bandwidth 4x vs float32. Chunk metadata lives in a
+    columnar Arrow table when pyarrow is available (off-heap, no
+    per-row Python objects), otherwise a DocumentChunk list; rows are
+    materialized lazily for just the top-k hits. An optional HNSW graph
+    covers large collections where O(log N) ANN beats the linear scan.
+
+    All pieces are bundled so a rebuild publishes them with one
+    reference assignment and a concurrent search never pairs a new
+    matrix with an old scale or metadata snapshot.
+    """
+
+    __slots__ = ('chunks', 'meta', 'emb_i8', 'scale', 'hnsw')
+
+    def __init__(self, chunks, meta, emb_i8, scale, hnsw):
+        self.chunks = chunks
+        self.meta = meta
+        self.emb_i8 = emb_i8
+        self.scale = scale
+        self.hnsw = hnsw
+
+    def materialize(self, idx) -> List[DocumentChunk]:
+        """
+        Materialize DocumentChunk objects for the given index rows.
+
+        Only the selected rows are converted to Python objects; the
+        rest of the metadata stays columnar.
+        """
+        if self.meta is not None:
+            rows = self.meta.take(idx).to_pylist()
+            return [
+                DocumentChunk(
+                    text=row['text'],
+                    url=row['url'],
+                    title=row['title'],
+                    heading=row['heading'] or None,
+                    chunk_id=row['chunk_id']
+                )
+                for row in rows
+            ]
+
+        return [self.chunks[i] for i in idx]
+
+
 class VectorStore:
     """Vector store for semantic search using Vertex AI embeddings and ChromaDB Cloud."""
     
@@ -90,8 +209,13 @@ class VectorStore:
         self.embedding_model_name = embedding_model
         self.collection_name = collection_name
         
-        # Initialize Vertex AI
-        vertexai.init(project=project_id, location=location)
+        # Initialize Vertex AI over gRPC so every embedding call shares
+        # one long-lived HTTP/2 channel instead of re-handshaking
+        try:
+            vertexai.init(project=project_id, location=location, api_transport="grpc")
+        except TypeError:
+            # Older SDKs don't accept api_transport
+            vertexai.init(project=project_id, location=location)
         self.embedding_model = TextEmbeddingModel.from_pretrained(embedding_model)
         
         # Initialize ChromaDB client
@@ -119,6 +243,29 @@ class VectorStore:
             logger.error(f"Failed to connect to collection: {e}")
             raise
         
+        # Local structure-of-arrays mirror of the collection embeddings,
+        # built lazily so searches can run as a single vectorized scan.
+        # Held as one immutable _LocalIndex snapshot swapped with a
+        # single assignment, so a background rebuild never hands a
+        # concurrent search mismatched matrix/scale/metadata pieces.
+        self._local_index: Optional[_LocalIndex] = None
+
+        # Persistent content-keyed embedding cache so re-indexes only
+        # pay Vertex AI calls for chunks whose text actually changed
+        try:
+            self._embedding_cache = EmbeddingCache()
+        except Exception as e:
+            logger.warning(f"Embedding cache unavailable: {e}")
+            self._embedding_cache = None
+
+        # In-memory memo for query embeddings: chatbots re-ask the same
+        # queries, and even a persistent-cache hit costs a SQLite read.
+        # Built per instance so the cache doesn't hold self alive at
+        # class level.
+        self._embed_query_cached = functools.lru_cache(maxsize=1024)(
+            self._embed_query_uncached
+        )
+
         logger.info(f"Initialized VectorStore with ChromaDB")
         logger.info(f"Embedding model: {embedding_model}")
     
@@ -130,65 +277,263 @@ class VectorStore:
     ) -> List[str]:
         """
         Split text into overlapping chunks.
-        
+
         Args:
             text: Text to chunk
             chunk_size: Maximum characters per chunk
             overlap: Overlap between chunks
-            
+
         Returns:
             List of text chunks
         """
+        return [c for c, _ in self._chunk_spans(text, chunk_size, overlap)]
+
+    def _chunk_spans(
+        self,
+        text: str,
+        chunk_size: int = 1000,
+        overlap: int = 200
+    ) -> List[Tuple[str, int]]:
+        """
+        Split text into overlapping chunks, keeping start offsets.
+
+        Args:
+            text: Text to chunk
+            chunk_size: Maximum characters per chunk
+            overlap: Overlap between chunks
+
+        Returns:
+            List of (chunk, start offset in text) tuples
+        """
+        # Every sentence boundary is located once up front; per-chunk
+        # rfind over 1000-char slices made this O(chunks x chunk_size)
+        # in pure-Python character scanning
+        boundaries = np.fromiter(
+            (m.start() for m in _BOUNDARY_RE.finditer(text)),
+            dtype=np.int64
+        )
+        min_break = chunk_size * 0.5
+
         chunks = []
         start = 0
-        
-        while start < len(text):
+        text_len = len(text)
+
+        while start < text_len:
             end = start + chunk_size
-            chunk = text[start:end]
-            
-            # Try to break at sentence boundary
-            if end < len(text):
-                last_period = chunk.rfind('.')
-                last_newline = chunk.rfind('\n')
-                break_point = max(last_period, last_newline)
-                
-                if break_point > chunk_size * 0.5:  # Only break if we're past halfway
-                    chunk = chunk[:break_point + 1]
-                    end = start + break_point + 1
-            
-            chunks.append(chunk.strip())
+
+            # Try to break at the last sentence boundary in the window
+            if end < text_len and boundaries.size:
+                idx = np.searchsorted(boundaries, end, side='left') - 1
+                if idx >= 0:
+                    break_point = int(boundaries[idx]) - start
+                    if break_point > min_break:  # Only break if we're past halfway
+                        end = start + break_point + 1
+
+            chunks.append((text[start:end].strip(), start))
             start = end - overlap
-        
-        return [c for c in chunks if c]  # Remove empty chunks
+
+        return [(c, s) for c, s in chunks if c]  # Remove empty chunks
     
-    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+    def _get_embeddings(self, texts: List[str], batch_size: int = 250) -> np.ndarray:
         """
         Get embeddings for a list of texts using Vertex AI.
-        
+
         Args:
             texts: List of texts to embed
-            
+            batch_size: Texts per Vertex AI request (250 is the endpoint's
+                per-call input limit)
+
         Returns:
             NumPy array of embeddings
         """
-        # Vertex AI has a batch limit, so process in batches
-        batch_size = 5
-        all_embeddings = []
-        
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        keys, cached, missing = self._cache_lookup(texts)
+
+        batches = [
+            missing[i:i + batch_size]
+            for i in range(0, len(missing), batch_size)
+        ]
+
+        fresh: Dict[bytes, np.ndarray] = {}
+        if batches:
+            # Each batch is an independent network round-trip; firing
+            # them from a small thread pool overlaps the RTTs instead of
+            # paying them one after another. executor.map preserves
+            # batch order.
+            if len(batches) > 1:
+                with ThreadPoolExecutor(max_workers=_EMBED_WORKERS) as pool:
+                    results = list(pool.map(self._embed_batch_remote, batches))
+            else:
+                results = [self._embed_batch_remote(batches[0])]
+
+            for batch, vectors in zip(batches, results):
+                for text, vector in zip(batch, vectors):
+                    fresh[content_key(self.embedding_model_name, text)] = vector
+
+        self._cache_store(fresh)
+
+        merged = {**cached, **fresh}
+        return _normalize_fp16(np.array([merged[key] for key in keys]))
+
+    def _embed_batch_remote(self, batch: List[str]) -> List[np.ndarray]:
+        """Embed one batch via Vertex AI, with zero-vector fallback."""
+        try:
+            embeddings = self.embedding_model.get_embeddings(batch)
+            return [np.asarray(emb.values, dtype=np.float32) for emb in embeddings]
+        except Exception as e:
+            logger.error(f"Error getting embeddings: {e}")
+            # Add zero vectors as fallback
+            return [np.zeros(768, dtype=np.float32) for _ in batch]
+
+    def _cache_lookup(
+        self,
+        texts: List[str]
+    ) -> Tuple[List[bytes], Dict[bytes, np.ndarray], List[str]]:
+        """
+        Resolve texts against the persistent embedding cache.
+
+        Args:
+            texts: Texts about to be embedded
+
+        Returns:
+            Tuple of (keys per text, cached key->vector hits, deduplicated
+            texts that still need embedding)
+        """
+        keys = [content_key(self.embedding_model_name, text) for text in texts]
+
+        cached: Dict[bytes, np.ndarray] = {}
+        if self._embedding_cache is not None:
             try:
-                embeddings = self.embedding_model.get_embeddings(batch)
-                batch_embeddings = [emb.values for emb in embeddings]
-                all_embeddings.extend(batch_embeddings)
-                logger.info(f"Embedded batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1}")
+                cached = self._embedding_cache.get_many(keys)
             except Exception as e:
-                logger.error(f"Error getting embeddings: {e}")
-                # Add zero vectors as fallback
-                all_embeddings.extend([[0.0] * 768 for _ in batch])
-        
-        return np.array(all_embeddings)
-    
+                logger.warning(f"Embedding cache lookup failed: {e}")
+
+        missing = list(dict.fromkeys(
+            text for text, key in zip(texts, keys) if key not in cached
+        ))
+        if cached:
+            logger.info(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} texts reused")
+
+        return keys, cached, missing
+
+    def _cache_store(self, fresh: Dict[bytes, np.ndarray]) -> None:
+        """Persist freshly embedded vectors, skipping error fallbacks."""
+        if not fresh or self._embedding_cache is None:
+            return
+        try:
+            # Don't persist the zero-vector error fallbacks
+            self._embedding_cache.put_many({
+                key: vec for key, vec in fresh.items() if vec.any()
+            })
+        except Exception as e:
+            logger.warning(f"Embedding cache store failed: {e}")
+
+    async def aembed_batch(self, texts: List[str], batch_size: int = 250) -> np.ndarray:
+        """
+        Async batch embedding over the shared Vertex AI channel.
+
+        Uses the SDK's native async call when available, so concurrent
+        batches multiplex one gRPC channel; otherwise falls back to the
+        sync path in a thread.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Texts per Vertex AI request
+
+        Returns:
+            NumPy array of embeddings, one row per input text
+        """
+        if not hasattr(self.embedding_model, 'get_embeddings_async'):
+            return await asyncio.to_thread(self.embed_batch, texts, batch_size)
+
+        keys, cached, missing = self._cache_lookup(texts)
+
+        batches = [
+            missing[i:i + batch_size]
+            for i in range(0, len(missing), batch_size)
+        ]
+
+        # Fire batches concurrently; the semaphore keeps the number of
+        # in-flight requests bounded (Vertex quotas are per-minute, not
+        # per-second). gather preserves batch order.
+        sem = asyncio.Semaphore(_EMBED_WORKERS)
+
+        async def embed_one(batch: List[str]) -> List[np.ndarray]:
+            async with sem:
+                try:
+                    embeddings = await self.embedding_model.get_embeddings_async(batch)
+                    return [np.asarray(emb.values, dtype=np.float32) for emb in embeddings]
+                except Exception as e:
+                    logger.error(f"Error getting embeddings: {e}")
+                    return [np.zeros(768, dtype=np.float32) for _ in batch]
+
+        results = await asyncio.gather(*(embed_one(batch) for batch in batches))
+
+        fresh: Dict[bytes, np.ndarray] = {}
+        for batch, vectors in zip(batches, results):
+            for text, vector in zip(batch, vectors):
+                fresh[content_key(self.embedding_model_name, text)] = vector
+
+        self._cache_store(fresh)
+
+        merged = {**cached, **fresh}
+        return _normalize_fp16(np.array([merged[key] for key in keys]))
+
+    def embed_batch(self, texts: List[str], batch_size: int = 250) -> np.ndarray:
+        """
+        Get embeddings for multiple texts in one batched request path.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Texts per Vertex AI request
+
+        Returns:
+            NumPy array of embeddings, one row per input text
+        """
+        return self._get_embeddings(texts, batch_size=batch_size)
+
+    def _embed_query_uncached(self, query: str) -> np.ndarray:
+        """Embed a single query, bypassing the in-memory memo."""
+        vec = self._get_embeddings([query])[0]
+        if not vec.any():
+            # Zero vector means the Vertex call failed; raising keeps
+            # lru_cache from memoizing the failure (it never caches
+            # calls that raise), so the next ask retries. The
+            # persistent cache refuses these too.
+            raise _ZeroEmbedding(vec)
+        vec.setflags(write=False)  # shared across memoized callers
+        return vec
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Get the embedding vector for a single query string.
+
+        Repeated queries return the memoized vector without touching
+        the network or the persistent cache.
+
+        Args:
+            query: Query text to embed
+
+        Returns:
+            Embedding vector as a NumPy array (read-only)
+        """
+        try:
+            return self._embed_query_cached(query)
+        except _ZeroEmbedding as e:
+            return e.vector
+
+    async def embed_query_async(self, query: str) -> np.ndarray:
+        """
+        Async wrapper around embed_query that runs the Vertex AI call in a
+        thread so the embedding round-trip can overlap with other work.
+
+        Args:
+            query: Query text to embed
+
+        Returns:
+            Embedding vector as a NumPy array
+        """
+        return await asyncio.to_thread(self.embed_query, query)
+
     def index_pages(
         self, 
         pages: List, 
@@ -204,85 +549,317 @@ class VectorStore:
             overlap: Overlap between chunks
         """
         logger.info(f"Indexing {len(pages)} pages...")
-        
-        # Clear existing collection data
-        try:
-            self.chroma_client.delete_collection(name=self.collection_name)
-            logger.info(f"Deleted existing collection: {self.collection_name}")
-        except:
-            pass
-        
-        self.collection = self.chroma_client.create_collection(
-            name=self.collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
-        logger.info(f"Created fresh collection: {self.collection_name}")
-        
+
+        self._recreate_collection()
+
         all_texts = []
         all_metadatas = []
         all_ids = []
-        
+
         # Create chunks from all pages
         chunk_counter = 0
         for page in pages:
-            page_chunks = self._chunk_text(page.content, chunk_size, overlap)
-            
-            for idx, chunk_text in enumerate(page_chunks):
-                # Skip extremely large chunks
-                if len(chunk_text) > 10000:
-                    logger.warning(f"Skipping large chunk ({len(chunk_text)} chars) from {page.url}")
-                    continue
-                    
-                # Try to associate chunk with a heading
-                heading = None
-                if page.headings:
-                    for h in page.headings:
-                        if h in chunk_text:
-                            heading = h
-                            break
-                
-                # Store metadata
-                metadata = {
-                    'url': str(page.url),
-                    'title': str(page.title)[:500],  # Limit title length
-                    'heading': str(heading)[:200] if heading else '',
-                    'chunk_id': int(idx)
-                }
-                
-                all_texts.append(chunk_text)
-                all_metadatas.append(metadata)
-                all_ids.append(f"chunk_{chunk_counter}")
-                chunk_counter += 1
-        
+            texts, metadatas, ids = self._page_chunk_records(
+                page, chunk_size, overlap, chunk_counter
+            )
+            all_texts.extend(texts)
+            all_metadatas.extend(metadatas)
+            all_ids.extend(ids)
+            chunk_counter += len(texts)
+
         logger.info(f"Created {len(all_texts)} chunks from {len(pages)} pages")
-        
-        # Generate embeddings using Vertex AI
-        embeddings = self._get_embeddings(all_texts)
-        logger.info(f"Generated {len(embeddings)} embeddings")
-        
-        # Add to ChromaDB in smaller batches (CloudaDB may have limits)
-        batch_size = 50
+
+        # Embed and upsert in aligned batches. ChromaDB accepts
+        # thousand-record adds, so batch as large as the data allows;
+        # embed_batch splits each add into parallel 250-input Vertex
+        # calls internally
+        batch_size = min(len(all_texts), 1000) or 1
         try:
             logger.info(f"Starting to add {len(all_texts)} chunks to ChromaDB Cloud...")
             for i in range(0, len(all_texts), batch_size):
                 batch_end = min(i + batch_size, len(all_texts))
-                
-                self.collection.add(
-                    embeddings=embeddings[i:batch_end].tolist(),
-                    documents=all_texts[i:batch_end],
-                    metadatas=all_metadatas[i:batch_end],
-                    ids=all_ids[i:batch_end]
+
+                self._flush_chunk_batch(
+                    all_texts[i:batch_end],
+                    all_metadatas[i:batch_end],
+                    all_ids[i:batch_end]
                 )
                 logger.info(f"Added batch {i//batch_size + 1}/{(len(all_texts)-1)//batch_size + 1} to ChromaDB")
-            
+
             logger.info(f"Successfully indexed {len(all_texts)} chunks in ChromaDB Cloud")
+
+            # Refresh the local fast-search index with the new embeddings
+            self._build_local_index()
         except Exception as e:
             logger.error(f"Error adding to ChromaDB: {e}")
             raise
+
+    async def index_pages_stream(
+        self,
+        pages,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        batch_size: int = 100
+    ) -> int:
+        """
+        Index pages from an async iterator, embedding and upserting as
+        pages arrive instead of after the whole crawl.
+
+        Overlaps crawl I/O with embedding and keeps peak memory at one
+        batch of chunks rather than every crawled page.
+
+        Args:
+            pages: Async iterator of WebPage objects
+            chunk_size: Size of text chunks
+            overlap: Overlap between chunks
+            batch_size: Chunks per embed+upsert flush
+
+        Returns:
+            Number of chunks indexed
+        """
+        logger.info("Indexing pages from crawl stream...")
+
+        self._recreate_collection()
+
+        buf_texts: List[str] = []
+        buf_metadatas: List[Dict] = []
+        buf_ids: List[str] = []
+        chunk_counter = 0
+        page_counter = 0
+
+        async for page in pages:
+            page_counter += 1
+            texts, metadatas, ids = self._page_chunk_records(
+                page, chunk_size, overlap, chunk_counter
+            )
+            buf_texts.extend(texts)
+            buf_metadatas.extend(metadatas)
+            buf_ids.extend(ids)
+            chunk_counter += len(texts)
+
+            while len(buf_texts) >= batch_size:
+                await asyncio.to_thread(
+                    self._flush_chunk_batch,
+                    buf_texts[:batch_size],
+                    buf_metadatas[:batch_size],
+                    buf_ids[:batch_size]
+                )
+                del buf_texts[:batch_size]
+                del buf_metadatas[:batch_size]
+                del buf_ids[:batch_size]
+
+        if buf_texts:
+            await asyncio.to_thread(
+                self._flush_chunk_batch, buf_texts, buf_metadatas, buf_ids
+            )
+
+        logger.info(f"Successfully indexed {chunk_counter} chunks from {page_counter} pages")
+
+        # Refresh the local fast-search index with the new embeddings
+        self._build_local_index()
+        return chunk_counter
+
+    def _recreate_collection(self) -> None:
+        """Drop and recreate the collection for a fresh index run."""
+        try:
+            self.chroma_client.delete_collection(name=self.collection_name)
+            logger.info(f"Deleted existing collection: {self.collection_name}")
+        except:
+            pass
+
+        self.collection = self.chroma_client.create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+        logger.info(f"Created fresh collection: {self.collection_name}")
+
+    def _page_chunk_records(
+        self,
+        page,
+        chunk_size: int,
+        overlap: int,
+        start_id: int
+    ) -> Tuple[List[str], List[Dict], List[str]]:
+        """
+        Build the chunk texts, metadata dicts, and ids for one page.
+
+        Args:
+            page: WebPage to chunk
+            chunk_size: Size of text chunks
+            overlap: Overlap between chunks
+            start_id: Value of the global chunk counter for the first id
+
+        Returns:
+            Tuple of (texts, metadatas, ids)
+        """
+        texts: List[str] = []
+        metadatas: List[Dict] = []
+        ids: List[str] = []
+        counter = start_id
+
+        page_chunks = self._chunk_spans(page.content, chunk_size, overlap)
+
+        # Locate each heading in the page content once; with the offset
+        # table a chunk's section heading is an O(log H) binary search
+        # on its start offset instead of substring scans per chunk.
+        # Headings absent from the extracted content (and therefore from
+        # every chunk of it) can never match anything, so there is no
+        # per-chunk fallback for them.
+        heading_offsets = None
+        heading_texts: List[str] = []
+        if page.headings:
+            located = sorted(
+                (off, h) for h in page.headings
+                if (off := page.content.find(h)) >= 0
+            )
+            if located:
+                heading_offsets = np.fromiter(
+                    (off for off, _ in located), dtype=np.int64
+                )
+                heading_texts = [h for _, h in located]
+
+        for idx, (chunk_text, chunk_start) in enumerate(page_chunks):
+            # Skip extremely large chunks
+            if len(chunk_text) > 10000:
+                logger.warning(f"Skipping large chunk ({len(chunk_text)} chars) from {page.url}")
+                continue
+
+            # Associate the chunk with the heading of the section it
+            # starts in (the last heading at or before its offset)
+            heading = None
+            if heading_offsets is not None:
+                h_idx = int(np.searchsorted(heading_offsets, chunk_start, side='right')) - 1
+                if h_idx >= 0:
+                    heading = heading_texts[h_idx]
+                elif int(heading_offsets[0]) < chunk_start + len(chunk_text):
+                    # No heading precedes the chunk, but the first one
+                    # appears inside it
+                    heading = heading_texts[0]
+
+            # Store metadata
+            metadata = {
+                'url': str(page.url),
+                'title': str(page.title)[:500],  # Limit title length
+                'heading': str(heading)[:200] if heading else '',
+                'chunk_id': int(idx)
+            }
+
+            texts.append(chunk_text)
+            metadatas.append(metadata)
+            ids.append(f"chunk_{counter}")
+            counter += 1
+
+        return texts, metadatas, ids
+
+    def _flush_chunk_batch(
+        self,
+        texts: List[str],
+        metadatas: List[Dict],
+        ids: List[str]
+    ) -> None:
+        """Embed one batch of chunks and add it to the collection."""
+        embeddings = self.embed_batch(texts)
+        self.collection.add(
+            # ChromaDB wants full-precision floats; the fp16 win is the
+            # in-process working set, not this boundary
+            embeddings=embeddings.astype(np.float32).tolist(),
+            documents=texts,
+            metadatas=metadatas,
+            ids=ids
+        )
     
+    def _build_local_index(self) -> bool:
+        """
+        Mirror the collection's embeddings into a contiguous, L2-normalized
+        float32 matrix plus a parallel chunk list.
+
+        With the matrix in place, a search is one `matrix @ query` BLAS
+        call instead of a per-chunk Python loop or a remote ChromaDB
+        round-trip.
+
+        Returns:
+            True if the local index was built, False otherwise
+        """
+        try:
+            data = self.collection.get(include=['embeddings', 'documents', 'metadatas'])
+            embeddings = data.get('embeddings')
+            documents = data.get('documents') or []
+            metadatas = data.get('metadatas') or []
+
+            if embeddings is None or len(embeddings) == 0:
+                return False
+
+            if _HAS_PYARROW:
+                # Columnar metadata: one Arrow table instead of one
+                # Python object (plus five strings) per chunk
+                local_meta = pa.table({
+                    'text': list(documents),
+                    'url': [m['url'] for m in metadatas],
+                    'title': [m['title'] for m in metadatas],
+                    'heading': [m.get('heading') or '' for m in metadatas],
+                    'chunk_id': [int(m.get('chunk_id', 0)) for m in metadatas],
+                })
+                local_chunks = None
+            else:
+                local_meta = None
+                local_chunks = []
+                for doc, metadata in zip(documents, metadatas):
+                    local_chunks.append(DocumentChunk(
+                        text=doc,
+                        url=metadata['url'],
+                        title=metadata['title'],
+                        heading=metadata['heading'] if metadata.get('heading') else None,
+                        chunk_id=metadata.get('chunk_id', 0)
+                    ))
+
+            # Contiguous float32 matrix, L2-normalized once at load time
+            emb = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            emb /= norms
+
+            # Symmetric int8 quantization with a per-row scale so the scan
+            # touches a quarter of the bytes of the float32 matrix
+            scale = np.abs(emb).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            emb_i8 = np.round(emb / scale[:, None]).astype(np.int8)
+
+            # For large collections, an HNSW graph turns the O(N) scan
+            # into an O(log N) approximate query
+            hnsw = None
+            if _HAS_HNSWLIB and len(emb) >= _HNSW_MIN_SIZE:
+                try:
+                    hnsw = hnswlib.Index(space='cosine', dim=emb.shape[1])
+                    hnsw.init_index(
+                        max_elements=len(emb), M=16, ef_construction=200
+                    )
+                    hnsw.add_items(emb, np.arange(len(emb)))
+                    hnsw.set_ef(64)
+                    logger.info(f"Built HNSW index over {len(emb)} vectors")
+                except Exception as e:
+                    logger.warning(f"Could not build HNSW index: {e}")
+                    hnsw = None
+
+            # Publish the finished snapshot with one assignment so a
+            # concurrent search sees either the old index or the new
+            # one, never a mix
+            self._local_index = _LocalIndex(
+                chunks=local_chunks,
+                meta=local_meta,
+                emb_i8=np.ascontiguousarray(emb_i8),
+                scale=scale.astype(np.float32),
+                hnsw=hnsw
+            )
+            logger.info(f"Built local embedding index with {len(emb_i8)} chunks (int8)")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not build local embedding index: {e}")
+            self._local_index = None
+            return False
+
     def search(
-        self, 
-        query: str, 
+        self,
+        query: str,
         top_k: int = 5
     ) -> List[Tuple[DocumentChunk, float]]:
         """
@@ -295,31 +872,115 @@ class VectorStore:
         Returns:
             List of (DocumentChunk, score) tuples
         """
-        # Get query embedding
-        query_embedding = self._get_embeddings([query])[0]
-        
-        # Query ChromaDB
+        # Get query embedding (memoized for repeated queries)
+        query_embedding = self.embed_query(query)
+
+        return self.search_by_vector(query_embedding, top_k=top_k)
+
+    def search_by_vector(
+        self,
+        vector: np.ndarray,
+        top_k: int = 5
+    ) -> List[Tuple[DocumentChunk, float]]:
+        """
+        Search for relevant chunks using a precomputed query embedding.
+
+        Avoids a second embedding round-trip when the caller already has
+        the query vector (e.g. from a semantic cache lookup).
+
+        Args:
+            vector: Query embedding vector
+            top_k: Number of results to return
+
+        Returns:
+            List of (DocumentChunk, score) tuples
+        """
+        # Fast path: batched cosine over the local quantized matrix.
+        # Take one reference up front - a concurrent rebuild swaps the
+        # whole snapshot, so everything below reads a consistent index.
+        index = self._local_index
+        if index is not None and len(index.emb_i8) > 0:
+            q = np.asarray(vector, dtype=np.float32)
+            q_norm = np.linalg.norm(q)
+            if q_norm > 0:
+                q = q / q_norm
+
+            # ANN path: query the HNSW graph instead of scanning
+            if index.hnsw is not None:
+                try:
+                    labels, distances = index.hnsw.knn_query(
+                        q.reshape(1, -1), k=min(top_k, index.hnsw.get_current_count())
+                    )
+                    idx = labels[0].astype(np.int64)
+                    scores = 1.0 - distances[0]
+                    chunks = index.materialize(idx)
+                    return [
+                        (chunk, float(score))
+                        for chunk, score in zip(chunks, scores)
+                    ]
+                except Exception as e:
+                    logger.debug(f"HNSW query failed, using linear scan: {e}")
+
+            # Quantize the query symmetrically and accumulate the int8 dot
+            # products in int32, then rescale back to cosine similarity
+            q_scale = float(np.abs(q).max()) / 127.0
+            if q_scale == 0:
+                q_scale = 1.0
+            q_i8 = np.round(q / q_scale).astype(np.int8)
+
+            scores = None
+            if _HAS_SIMSIMD:
+                # simsimd dispatches to the best AVX-512/NEON int8 kernel
+                # at load time. Cosine over the quantized rows is valid
+                # because the per-row scales cancel out of the ratio.
+                try:
+                    dist = np.asarray(
+                        simsimd.cdist(
+                            q_i8.reshape(1, -1), index.emb_i8, "cosine"
+                        ),
+                        dtype=np.float32
+                    )[0]
+                    scores = 1.0 - dist
+                except Exception as e:
+                    logger.debug(f"simsimd kernel failed, using NumPy: {e}")
+
+            if scores is None:
+                s_int = np.einsum('ij,j->i', index.emb_i8, q_i8, dtype=np.int32)
+                scores = s_int.astype(np.float32) * (index.scale * q_scale)
+
+            idx = topk(scores, top_k)
+            chunks = index.materialize(idx)
+            return [
+                (chunk, float(scores[i]))
+                for chunk, i in zip(chunks, idx)
+            ]
+
+        # Fallback: query ChromaDB
         results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
+            query_embeddings=[np.asarray(vector, dtype=np.float32).tolist()],
             n_results=top_k
         )
-        
+
         # Convert results to DocumentChunk format
         chunks_with_scores = []
         if results['documents'] and len(results['documents'][0]) > 0:
-            for i in range(len(results['documents'][0])):
-                metadata = results['metadatas'][0][i]
+            # ChromaDB returns distances; convert to similarity scores
+            # in one vectorized step rather than per element
+            distances = np.asarray(results['distances'][0], dtype=np.float32)
+            scores = 1.0 / (1.0 + distances)
+
+            for doc, metadata, score in zip(
+                results['documents'][0], results['metadatas'][0], scores.tolist()
+            ):
                 chunk = DocumentChunk(
-                    text=results['documents'][0][i],
+                    text=doc,
                     url=metadata['url'],
                     title=metadata['title'],
                     heading=metadata['heading'] if metadata['heading'] else None,
                     chunk_id=metadata['chunk_id']
                 )
-                # ChromaDB returns distances, convert to similarity score
-                score = 1 / (1 + results['distances'][0][i])
                 chunks_with_scores.append((chunk, score))
-        
+
         return chunks_with_scores
     
     def save(self) -> None:
@@ -344,6 +1005,7 @@ class VectorStore:
             count = self.collection.count()
             if count > 0:
                 logger.info(f"Connected to ChromaDB collection '{self.collection_name}' with {count} chunks")
+                self._build_local_index()
                 return True
             else:
                 logger.warning(f"ChromaDB collection '{self.collection_name}' is empty")
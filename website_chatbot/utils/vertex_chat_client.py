@@ -4,39 +4,88 @@ Custom implementation to use Google Vertex AI models with the agent framework.
 """
 
 import asyncio
+import functools
 from typing import List, Optional, AsyncIterator, Dict, Any
 from dataclasses import dataclass
 import logging
 
+import datetime
+
 import vertexai
 from vertexai.generative_models import GenerativeModel, Content, Part
 from google.oauth2 import service_account
 
+# Context caching is only available in newer SDK versions
+try:
+    from vertexai.caching import CachedContent
+except ImportError:
+    try:
+        from vertexai.preview.caching import CachedContent
+    except ImportError:
+        CachedContent = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     """Represents a chat message."""
     role: str  # 'user' or 'assistant'
     content: str
-    
+
+    # Map roles to Vertex AI format; Vertex AI doesn't have a separate
+    # system role. Built once at class scope, not per message.
+    _ROLE_MAP = {
+        'user': 'user',
+        'assistant': 'model',
+        'system': 'user'
+    }
+
     def to_vertex_content(self) -> Content:
         """Convert to Vertex AI Content format."""
-        # Map roles to Vertex AI format
-        role_mapping = {
-            'user': 'user',
-            'assistant': 'model',
-            'system': 'user'  # Vertex AI doesn't have separate system role
-        }
-        
         return Content(
-            role=role_mapping.get(self.role, 'user'),
+            role=self._ROLE_MAP.get(self.role, 'user'),
             parts=[Part.from_text(self.content)]
         )
 
 
+@functools.lru_cache(maxsize=32)
+def _system_content(system_instruction: str) -> Content:
+    """
+    Inline-system-instruction Content, built once per distinct prompt.
+
+    Chat system prompts are long and fixed, so rebuilding the protobuf
+    every turn is pure overhead; the memo hands back the same object.
+    """
+    return Content(
+        role='user',
+        parts=[Part.from_text(f"System: {system_instruction}")]
+    )
+
+
+# Server-side lifetime of the context cache, and how early to recreate
+# it so no request is ever issued against an expired cache
+_CONTEXT_CACHE_TTL = datetime.timedelta(hours=1)
+_CONTEXT_CACHE_MARGIN = datetime.timedelta(minutes=5)
+
+
+def _cache_expiry(cached_content) -> datetime.datetime:
+    """
+    When to stop using a CachedContent and recreate it.
+
+    Prefers the server's expire_time; falls back to now + TTL. Either
+    way the refresh margin is subtracted so a cache is never used
+    right at its expiry.
+    """
+    expiry = getattr(cached_content, 'expire_time', None)
+    if expiry is None:
+        expiry = datetime.datetime.now(datetime.timezone.utc) + _CONTEXT_CACHE_TTL
+    elif expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+    return expiry - _CONTEXT_CACHE_MARGIN
+
+
 class VertexAIChatClient:
     """
     Chat client that uses Google Vertex AI models.
@@ -62,23 +111,119 @@ class VertexAIChatClient:
         self.project_id = project_id
         self.location = location
         self.model_name = model_name
-        
-        # Initialize Vertex AI
+
+        # Resolve credentials once so they are refreshed lazily by the
+        # SDK instead of re-discovered on every call
         if credentials_path:
             credentials = service_account.Credentials.from_service_account_file(
                 credentials_path
             )
+        else:
+            import google.auth
+            credentials, _ = google.auth.default()
+
+        # Prefer the gRPC transport: a single long-lived HTTP/2 channel
+        # with keepalive avoids a fresh TLS handshake per request
+        try:
+            vertexai.init(
+                project=project_id,
+                location=location,
+                credentials=credentials,
+                api_transport="grpc"
+            )
+        except TypeError:
+            # Older SDKs don't accept api_transport
             vertexai.init(
-                project=project_id, 
+                project=project_id,
                 location=location,
                 credentials=credentials
             )
-        else:
-            vertexai.init(project=project_id, location=location)
-        
+
         self.model = GenerativeModel(model_name)
+        self._session_ready = False
+
+        # Server-side context cache for the static system instruction so
+        # Vertex doesn't re-prefill it on every request
+        self._cached_model: Optional[GenerativeModel] = None
+        self._cached_system: Optional[str] = None
+        self._cached_expiry: Optional[datetime.datetime] = None
+        self._context_cache_failed = False
+
         logger.info(f"Initialized Vertex AI client with model: {model_name}")
-    
+
+    def _model_for_system(self, system_instruction: Optional[str]) -> Optional[GenerativeModel]:
+        """
+        Return a model bound to a server-side context cache holding the
+        system instruction, or None if context caching is unavailable.
+
+        The cache is created once per system instruction and recreated
+        shortly before its server-side TTL lapses; subsequent calls
+        reuse the cached attention prefix instead of re-prefilling it.
+
+        Args:
+            system_instruction: System instruction to cache
+
+        Returns:
+            Cached GenerativeModel, or None to use the plain model
+        """
+        if (
+            not system_instruction
+            or CachedContent is None
+            or self._context_cache_failed
+        ):
+            return None
+
+        if (
+            self._cached_system == system_instruction
+            and self._cached_model is not None
+            and self._cached_expiry is not None
+            and datetime.datetime.now(datetime.timezone.utc) < self._cached_expiry
+        ):
+            return self._cached_model
+
+        try:
+            cached_content = CachedContent.create(
+                model_name=self.model_name,
+                system_instruction=system_instruction,
+                ttl=_CONTEXT_CACHE_TTL
+            )
+            self._cached_model = GenerativeModel.from_cached_content(
+                cached_content=cached_content
+            )
+            self._cached_system = system_instruction
+            self._cached_expiry = _cache_expiry(cached_content)
+            logger.info("Created Vertex AI context cache for system instruction")
+            return self._cached_model
+        except Exception as e:
+            # Context caching has minimum token requirements and isn't
+            # available for all models - fall back to inline instructions
+            logger.warning(f"Context caching unavailable, falling back: {e}")
+            self._cached_model = None
+            self._cached_system = None
+            self._cached_expiry = None
+            self._context_cache_failed = True
+            return None
+
+    async def _ensure_session(self) -> None:
+        """
+        Warm up the underlying Vertex AI client once so the first generate
+        call doesn't pay auth refresh / channel setup cost. Safe to call
+        repeatedly; subsequent calls are no-ops.
+        """
+        if self._session_ready:
+            return
+
+        def _warm():
+            try:
+                # Touching the prediction client forces the SDK to create
+                # its transport channel and refresh credentials
+                getattr(self.model, '_prediction_client', None)
+            except Exception as e:
+                logger.debug(f"Client warmup skipped: {e}")
+
+        await asyncio.to_thread(_warm)
+        self._session_ready = True
+
     async def generate_response(
         self,
         messages: List[ChatMessage],
@@ -99,37 +244,46 @@ class VertexAIChatClient:
             Generated response text
         """
         try:
+            # Prefer a model bound to a server-side context cache holding
+            # the system instruction (first call creates the cache)
+            model = await asyncio.to_thread(
+                self._model_for_system, system_instruction
+            )
+
             # Build conversation history
             contents = []
-            
-            # Add system instruction as first user message if provided
-            if system_instruction:
-                contents.append(Content(
-                    role='user',
-                    parts=[Part.from_text(f"System: {system_instruction}")]
-                ))
-            
+
+            # Without a context cache, send the system instruction inline
+            if model is None:
+                model = self.model
+                if system_instruction:
+                    contents.append(_system_content(system_instruction))
+
             # Add conversation history
             for msg in messages:
                 contents.append(msg.to_vertex_content())
-            
+
             # Generate response
             generation_config = {
                 'temperature': temperature,
                 'max_output_tokens': max_tokens,
             }
-            
-            # Use generate_content for synchronous generation
-            # We'll run it in executor to make it async
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content(
+
+            # The SDK's native async call drives the request from this
+            # event loop directly - no worker thread or GIL hand-off
+            if hasattr(model, 'generate_content_async'):
+                response = await model.generate_content_async(
                     contents,
                     generation_config=generation_config
                 )
-            )
-            
+            else:
+                # Older SDKs only expose the sync call
+                response = await asyncio.to_thread(
+                    model.generate_content,
+                    contents,
+                    generation_config=generation_config
+                )
+
             return response.text
             
         except Exception as e:
@@ -156,37 +310,52 @@ class VertexAIChatClient:
             Response text chunks
         """
         try:
+            # Prefer a model bound to a server-side context cache holding
+            # the system instruction (first call creates the cache)
+            model = await asyncio.to_thread(
+                self._model_for_system, system_instruction
+            )
+
             # Build conversation history
             contents = []
-            
-            if system_instruction:
-                contents.append(Content(
-                    role='user',
-                    parts=[Part.from_text(f"System: {system_instruction}")]
-                ))
-            
+
+            # Without a context cache, send the system instruction inline
+            if model is None:
+                model = self.model
+                if system_instruction:
+                    contents.append(_system_content(system_instruction))
+
             for msg in messages:
                 contents.append(msg.to_vertex_content())
-            
+
             generation_config = {
                 'temperature': temperature,
                 'max_output_tokens': max_tokens,
             }
-            
-            # Generate streaming response
-            loop = asyncio.get_event_loop()
-            response_stream = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content(
+
+            # Stream natively when the SDK supports it: chunks arrive on
+            # the event loop as they are produced instead of crossing a
+            # thread per response
+            if hasattr(model, 'generate_content_async'):
+                response_stream = await model.generate_content_async(
                     contents,
                     generation_config=generation_config,
                     stream=True
                 )
-            )
-            
-            for chunk in response_stream:
-                if chunk.text:
-                    yield chunk.text
+                async for chunk in response_stream:
+                    if chunk.text:
+                        yield chunk.text
+            else:
+                # Older SDKs only expose the sync call
+                response_stream = await asyncio.to_thread(
+                    model.generate_content,
+                    contents,
+                    generation_config=generation_config,
+                    stream=True
+                )
+                for chunk in response_stream:
+                    if chunk.text:
+                        yield chunk.text
                     
         except Exception as e:
             logger.error(f"Error in streaming response: {e}")